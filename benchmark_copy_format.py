@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+COPY Format Benchmark
+Compares streamed CSV, text and binary COPY between the source and
+destination databases on a wide mixed-type table.
+
+Only end-to-end wall time and the CPU of this client process are measured.
+Server CPU on either database is not collected, so a format that shifts work
+onto the servers can look faster here than it is under concurrent load.
+"""
+
+import os
+import sys
+import time
+import logging
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+from data_transfer import PostgreSQLDataTransfer
+
+logger = logging.getLogger(__name__)
+
+# Distinct names so that pointing source and destination at the same database
+# never truncates or drops the populated source table
+SOURCE_TABLE = "copy_format_benchmark"
+TARGET_TABLE = "copy_format_benchmark_target"
+
+# Wide table mixing the types that are expensive to render as text
+TABLE_DDL = """
+CREATE TABLE {schema}.{table} (
+    id bigint PRIMARY KEY,
+    int_1 integer, int_2 integer, int_3 integer,
+    big_1 bigint, big_2 bigint, big_3 bigint,
+    num_1 numeric(18,4), num_2 numeric(18,4), num_3 numeric(18,4), num_4 numeric(30,10),
+    dbl_1 double precision, dbl_2 double precision,
+    flag boolean,
+    created_at timestamptz, updated_at timestamptz, event_date date,
+    label text, description text,
+    ref uuid,
+    payload jsonb,
+    scores integer[], tags text[],
+    blob bytea
+)
+"""
+
+POPULATE_SQL = """
+INSERT INTO {schema}.{table}
+SELECT
+    g,
+    g % 1000, g % 77, g * 3,
+    g * 1000003, g * 7919, -g,
+    g * 1.2345, g / 7.0, (g % 997) * 3.3333, g * 123456.0000000001,
+    g / 3.0, sqrt(g),
+    g % 2 = 0,
+    now() - g * interval '1 minute', now(), current_date - (g % 3650)::int,
+    'label ' || g, CASE WHEN g % 10 = 0 THEN NULL ELSE repeat('x', (g % 64)::int) END,
+    md5(g::text)::uuid,
+    jsonb_build_object('id', g, 'name', 'row ' || g, 'values', jsonb_build_array(g, g * 2, g * 3)),
+    ARRAY[g % 10, g % 100, g % 1000]::integer[], ARRAY['a' || g % 5, 'b' || g % 7],
+    decode(md5(g::text) || md5((g + 1)::text), 'hex')
+FROM generate_series(1::bigint, {rows}) g
+"""
+
+def prepare_tables(transfer, schema, rows):
+    """Create and populate the benchmark table on the source and an empty target table on the destination"""
+    for config, table, populate in ((transfer.source_config, SOURCE_TABLE, True), (transfer.dest_config, TARGET_TABLE, False)):
+        with transfer.get_connection(config, autocommit=True) as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+                cursor.execute(f"DROP TABLE IF EXISTS {schema}.{table}")
+                cursor.execute(TABLE_DDL.format(schema=schema, table=table))
+                if populate:
+                    logger.info(f"Populating {schema}.{table} with {rows:,} rows...")
+                    cursor.execute(POPULATE_SQL.format(schema=schema, table=table, rows=int(rows)))
+                    cursor.execute(f"ANALYZE {schema}.{table}")
+
+def drop_tables(transfer, schema):
+    """Remove the benchmark tables from both databases"""
+    for config, table in ((transfer.source_config, SOURCE_TABLE), (transfer.dest_config, TARGET_TABLE)):
+        with transfer.get_connection(config, autocommit=True) as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {schema}.{table}")
+
+def run_format(transfer, schema, copy_format, runs):
+    """Stream the whole benchmark table with one COPY format, returning the best wall and client CPU time"""
+    transfer.copy_format = copy_format
+    source_table = f"{schema}.{SOURCE_TABLE}"
+    target_table = f"{schema}.{TARGET_TABLE}"
+    best_wall, best_cpu, rows = None, None, 0
+
+    with transfer.get_connection(transfer.source_config) as source_conn:
+        with transfer.get_connection(transfer.dest_config) as dest_conn:
+            column_names = transfer.get_source_columns(source_conn)
+
+            for run in range(runs):
+                with dest_conn.cursor() as dest_cursor:
+                    dest_cursor.execute(f"TRUNCATE {target_table}")
+                    dest_conn.commit()
+
+                    wall_start, cpu_start = time.perf_counter(), time.process_time()
+                    rows = transfer.stream_copy(
+                        source_conn, dest_cursor, f"SELECT * FROM {source_table}", [],
+                        target_table, column_names
+                    )
+                    dest_conn.commit()
+                    source_conn.commit()
+                    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+                logger.info(f"{copy_format} run {run + 1}/{runs}: {rows:,} rows in {wall:.2f}s")
+                best_wall = wall if best_wall is None else min(best_wall, wall)
+                best_cpu = cpu if best_cpu is None else min(best_cpu, cpu)
+
+    return rows, best_wall, best_cpu
+
+def main():
+    """Run the CSV / text / binary comparison"""
+    rows = int(os.getenv('BENCHMARK_ROWS', '200000'))
+    runs = int(os.getenv('BENCHMARK_RUNS', '3'))
+    schema = os.getenv('BENCHMARK_SCHEMA', 'copy_benchmark')
+    formats = ['csv', 'text', 'binary']
+
+    transfer = PostgreSQLDataTransfer()
+    transfer.source_db_schema = schema
+    transfer.table_name = SOURCE_TABLE
+
+    logger.info("=== COPY Format Benchmark ===")
+    logger.info(f"Source: {transfer.source_config['host']}/{transfer.source_config['database']}")
+    logger.info(f"Destination: {transfer.dest_config['host']}/{transfer.dest_config['database']}")
+    logger.info("Compares end-to-end wall time and client CPU only; server CPU is not measured")
+
+    prepare_tables(transfer, schema, rows)
+
+    results = {}
+    try:
+        for copy_format in formats:
+            results[copy_format] = run_format(transfer, schema, copy_format, runs)
+    finally:
+        if os.getenv('BENCHMARK_KEEP_TABLES', 'false').lower() != 'true':
+            drop_tables(transfer, schema)
+
+    baseline_wall = results['csv'][1]
+    logger.info("")
+    logger.info(f"{'format':<8} {'rows':>12} {'best wall':>10} {'rows/sec':>12} {'client cpu':>11} {'vs csv':>7}")
+    for copy_format in formats:
+        copied, wall, cpu = results[copy_format]
+        logger.info(
+            f"{copy_format:<8} {copied:>12,} {wall:>9.2f}s {copied / wall:>12,.0f} "
+            f"{cpu:>10.2f}s {baseline_wall / wall:>6.2f}x"
+        )
+
+if __name__ == "__main__":
+    sys.exit(main())
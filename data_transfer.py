@@ -1,14 +1,22 @@
 import psycopg2
+import psycopg2.errors
 import pandas as pd
 import logging
-from datetime import datetime, timedelta
 import time
 import os
 from typing import Optional, Tuple, List, Dict, Any
 import sys
 from contextlib import contextmanager
-import gc
+import tracemalloc
 import ssl
+import queue
+import threading
+import json
+import uuid
+import copy
+import io
+import csv
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Configure logging
 logging.basicConfig(
@@ -21,15 +29,723 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-class PostgreSQLDataTransfer:
+# Run before hashing ROW(...)::text so both servers render every value the same way
+CHECKSUM_SESSION_SETTINGS = (
+    "SET LOCAL TimeZone = 'UTC'; SET LOCAL DateStyle = 'ISO, YMD'; SET LOCAL IntervalStyle = 'postgres'; "
+    "SET LOCAL extra_float_digits = 1; SET LOCAL bytea_output = 'hex'"
+)
+
+def quote_ident(name: str) -> str:
+    """Quote an identifier read from the catalog so it is safe to embed in SQL"""
+    return '"' + name.replace('"', '""') + '"'
+
+def create_if_not_exists(conn, ddl: str):
+    """
+    Run and commit a CREATE ... IF NOT EXISTS statement. Two sessions racing on
+    IF NOT EXISTS can both pass the check and one then fails on the catalog's
+    unique index; that loser just rolls back, since the object now exists.
+    """
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(ddl)
+        conn.commit()
+    except (psycopg2.errors.UniqueViolation, psycopg2.errors.DuplicateTable, psycopg2.errors.DuplicateSchema):
+        conn.rollback()
+
+class TransferCancelled(Exception):
+    """Raised in a transfer's threads once its CancellationToken has been cancelled"""
+
+class CancellationToken:
+    """
+    Cooperative cancellation for everything working on one transfer job.
+    
+    cancel() sets a flag that the batch loops and COPY streams check, and sends
+    a cancel request (pg_cancel_backend under the hood) for whatever statement
+    each connection currently checked out by the job is running, so an in-flight
+    COPY stops within seconds instead of at the next batch boundary.
+    """
+
     def __init__(self):
+        self._event = threading.Event()
+        self._connections = set()
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise TransferCancelled("Transfer cancelled")
+
+    def cancel(self):
+        with self._lock:
+            self._event.set()
+            connections = list(self._connections)
+            # Holding the lock keeps these connections from going back to the pool mid-cancel
+            for conn in connections:
+                try:
+                    conn.cancel()
+                except Exception as e:
+                    logger.warning(f"Could not cancel statement on connection: {e}")
+        logger.info(f"Cancellation requested; interrupted {len(connections)} connections")
+
+    def register(self, conn):
+        with self._lock:
+            self._connections.add(conn)
+        if self._event.is_set():
+            conn.cancel()
+
+    def unregister(self, conn):
+        with self._lock:
+            self._connections.discard(conn)
+
+class CopyStreamAborted(Exception):
+    """Raised inside a COPY stream when the other side of the pipe has given up"""
+
+class CopyStreamPipe:
+    """
+    Bounded in-memory pipe between COPY ... TO STDOUT on one connection and
+    COPY ... FROM STDIN on another. psycopg2 calls write() from the producer
+    thread and read() from the consumer; data stays as raw COPY bytes and at
+    most max_chunks * chunk_size bytes are buffered at any time.
+    """
+
+    def __init__(self, max_chunks: int, chunk_size: int = 1024 * 1024, cancel_token: Optional[CancellationToken] = None):
+        self.chunk_size = chunk_size
+        self.cancel_token = cancel_token
+        self.bytes_transferred = 0
+        self._queue = queue.Queue(maxsize=max_chunks)
+        self._pending = bytearray()
+        self._aborted = threading.Event()
+        self._error = None
+        self._eof = False
+
+    def write(self, data) -> int:
+        """Producer side: collect COPY data messages into chunks and queue them"""
+        self._pending += data
+        if len(self._pending) >= self.chunk_size:
+            self._put(bytes(self._pending))
+            self._pending.clear()
+        return len(data)
+
+    def close(self, error: Optional[BaseException] = None):
+        """Producer side: flush what is left and signal end of stream (or failure)"""
+        try:
+            if error is None and self._pending:
+                self._put(bytes(self._pending))
+        except (CopyStreamAborted, TransferCancelled):
+            return
+        finally:
+            self._pending.clear()
+        self._error = error
+        try:
+            self._put(None)
+        except (CopyStreamAborted, TransferCancelled):
+            pass
+
+    def read(self, size: int = -1) -> bytes:
+        """Consumer side: hand the next chunk to COPY FROM STDIN, b'' at end of stream"""
+        if self._eof:
+            return b''
+        while True:
+            if self.cancel_token is not None:
+                self.cancel_token.raise_if_cancelled()
+            try:
+                chunk = self._queue.get(timeout=0.5)
+                break
+            except queue.Empty:
+                continue
+        if chunk is None:
+            self._eof = True
+            if self._error is not None:
+                raise CopyStreamAborted(f"Source COPY failed: {self._error}")
+            return b''
+        self.bytes_transferred += len(chunk)
+        return chunk
+
+    def abort(self):
+        """Consumer side: stop the producer, e.g. when the destination COPY failed"""
+        self._aborted.set()
+
+    def _put(self, item):
+        while True:
+            if self._aborted.is_set():
+                raise CopyStreamAborted("Destination COPY aborted")
+            if self.cancel_token is not None:
+                self.cancel_token.raise_if_cancelled()
+            try:
+                self._queue.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+def prefetch(items, depth: int, cancel_token: Optional[CancellationToken] = None, name: str = 'batch-prefetch'):
+    """
+    Run the items iterator on a producer thread, keeping at most depth items
+    queued ahead of the consumer. The producer's exceptions are re-raised here;
+    closing this generator stops the producer at its next hand-off and waits
+    for it, so the producer's connection is free again afterwards.
+    """
+    ready = queue.Queue(maxsize=max(1, depth))
+    stopped = threading.Event()
+    done = object()
+
+    def put(entry) -> bool:
+        while not stopped.is_set():
+            try:
+                ready.put(entry, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put((item, None)):
+                    return
+            put((done, None))
+        except Exception as e:
+            put((None, e))
+        finally:
+            close = getattr(items, 'close', None)
+            if close is not None:
+                close()
+
+    producer = threading.Thread(target=produce, name=name, daemon=True)
+    producer.start()
+    try:
+        while True:
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            try:
+                item, error = ready.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if error is not None:
+                raise error
+            if item is done:
+                return
+            yield item
+    finally:
+        stopped.set()
+        producer.join()
+
+def connect_with_retry(config: dict):
+    """Open a new connection, retrying with exponential backoff when SSL drops during the handshake"""
+    max_retries = 3
+    retry_delay = 5
+    
+    for attempt in range(max_retries):
+        try:
+            logger.info(f"Attempting to connect to {config['host']}:{config['port']} (attempt {attempt + 1}/{max_retries})")
+            conn = psycopg2.connect(**config)
+            logger.info(f"Successfully connected to {config['host']}")
+            return conn
+            
+        except psycopg2.OperationalError as e:
+            if "SSL connection has been closed unexpectedly" in str(e):
+                logger.error(f"SSL connection error (attempt {attempt + 1}/{max_retries}): {e}")
+                if attempt < max_retries - 1:
+                    logger.info(f"Retrying in {retry_delay} seconds...")
+                    time.sleep(retry_delay)
+                    retry_delay *= 2  # Exponential backoff
+                else:
+                    logger.error("Max retries reached. SSL connection failed.")
+                    raise
+            else:
+                logger.error(f"Database connection error: {e}")
+                raise
+                
+        except Exception as e:
+            logger.error(f"Database connection error: {e}")
+            raise
+    
+    raise Exception("Failed to establish database connection after all retries")
+
+class ConnectionPool:
+    """
+    Thread-safe pool of connections for one connection config.
+    
+    Connections are opened lazily up to max_size and reused LIFO. A connection
+    is only probed with SELECT 1 on checkout when it has sat idle longer than
+    health_check_interval, and idle connections beyond min_size are closed
+    after idle_timeout seconds.
+    """
+
+    def __init__(self, config: dict, min_size: int = 1, max_size: int = 10,
+                 idle_timeout: float = 300, health_check_interval: float = 30, acquire_timeout: float = 60):
+        self.config = config
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.acquire_timeout = acquire_timeout
+        self._idle = []  # (connection, last_used) with the most recently used last
+        self._size = 0
+        self._cond = threading.Condition()
+        self._stats = {
+            'created': 0,
+            'reused': 0,
+            'discarded': 0,
+            'evicted': 0,
+            'waits': 0,
+            'health_checks': 0,
+            'health_check_failures': 0
+        }
+
+    def acquire(self):
+        """Check out a healthy connection, opening a new one if the pool has room"""
+        deadline = time.monotonic() + self.acquire_timeout
+        
+        while True:
+            candidate = None
+            with self._cond:
+                self._evict_idle()
+                if self._idle:
+                    candidate = self._idle.pop()
+                elif self._size < self.max_size:
+                    self._size += 1
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise Exception(f"Timed out waiting for a connection to {self.config['host']} (pool max_size={self.max_size})")
+                    self._stats['waits'] += 1
+                    self._cond.wait(remaining)
+                    continue
+            
+            if candidate is None:
+                try:
+                    conn = connect_with_retry(self.config)
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._stats['created'] += 1
+                return conn
+            
+            conn, last_used = candidate
+            if self._is_healthy(conn, last_used):
+                with self._cond:
+                    self._stats['reused'] += 1
+                return conn
+            
+            self._discard(conn)
+
+    def release(self, conn):
+        """Return a connection, resetting its transaction state or discarding it if it is broken"""
+        status = conn.info.transaction_status if not conn.closed else None
+        healthy = status is not None
+        
+        if healthy:
+            try:
+                if status in (psycopg2.extensions.TRANSACTION_STATUS_INTRANS, psycopg2.extensions.TRANSACTION_STATUS_INERROR):
+                    conn.rollback()
+                elif status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    healthy = False  # Mid-COPY or lost; not safe to hand out again
+                if healthy and conn.autocommit:
+                    conn.autocommit = False
+            except Exception as e:
+                logger.warning(f"Discarding pooled connection to {self.config['host']}: {e}")
+                healthy = False
+        
+        if not healthy:
+            self._discard(conn)
+            return
+        
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def ensure_max_size(self, size: int):
+        """Grow max_size so callers that need size connections at once cannot starve each other"""
+        with self._cond:
+            if size > self.max_size:
+                logger.info(f"Raising pool max_size for {self.config['host']} from {self.max_size} to {size}")
+                self.max_size = size
+                self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool counters and current size"""
+        with self._cond:
+            return {
+                'host': self.config['host'],
+                'port': self.config['port'],
+                'database': self.config['database'],
+                'user': self.config['user'],
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                **self._stats
+            }
+
+    def close(self):
+        """Close every idle connection; checked-out ones are closed when released"""
+        with self._cond:
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._close_quietly(conn)
+                self._size -= 1
+
+    def _is_healthy(self, conn, last_used: float) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used < self.health_check_interval:
+            return True
+        
+        with self._cond:
+            self._stats['health_checks'] += 1
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            conn.rollback()
+            return True
+        except Exception as e:
+            logger.warning(f"Pooled connection to {self.config['host']} failed health check: {e}")
+            with self._cond:
+                self._stats['health_check_failures'] += 1
+            return False
+
+    def _discard(self, conn):
+        self._close_quietly(conn)
+        with self._cond:
+            self._size -= 1
+            self._stats['discarded'] += 1
+            self._cond.notify()
+
+    def _evict_idle(self):
+        """Close connections idle past idle_timeout, oldest first, keeping min_size open (caller holds the lock)"""
+        now = time.monotonic()
+        while self._idle and self._size > self.min_size and now - self._idle[0][1] > self.idle_timeout:
+            conn, _ = self._idle.pop(0)
+            self._close_quietly(conn)
+            self._size -= 1
+            self._stats['evicted'] += 1
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception as e:
+            logger.warning(f"Error closing connection: {e}")
+
+_connection_pools: Dict[tuple, ConnectionPool] = {}
+_connection_pools_lock = threading.Lock()
+
+def get_connection_pool(config: dict) -> ConnectionPool:
+    """Return the process-wide pool for this exact connection config, creating it on first use"""
+    key = tuple(sorted((name, str(value)) for name, value in config.items()))
+    with _connection_pools_lock:
+        pool = _connection_pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(
+                dict(config),
+                min_size=int(os.getenv('POOL_MIN_SIZE', '1')),
+                max_size=int(os.getenv('POOL_MAX_SIZE', '10')),
+                idle_timeout=float(os.getenv('POOL_IDLE_TIMEOUT', '300')),
+                health_check_interval=float(os.getenv('POOL_HEALTH_CHECK_INTERVAL', '30')),
+                acquire_timeout=float(os.getenv('POOL_ACQUIRE_TIMEOUT', '60'))
+            )
+            _connection_pools[key] = pool
+        return pool
+
+def get_pool_stats() -> List[Dict[str, Any]]:
+    """Stats for every connection pool in this process"""
+    with _connection_pools_lock:
+        pools = list(_connection_pools.values())
+    return [pool.stats() for pool in pools]
+
+class CheckpointStore:
+    """
+    Control table on the destination recording, per source/warehouse table pair
+    and planned range, where the last committed batch ended. Positions are
+    updated in the same transaction as the batch they describe, so after a
+    failure the table and its checkpoint always agree.
+    """
+
+    def __init__(self, schema: str, table: str = 'transfer_checkpoints'):
+        self.table = f"{schema}.{table}"
+
+    def ensure_table(self, dest_conn):
+        create_if_not_exists(dest_conn, f"""
+            CREATE TABLE IF NOT EXISTS {self.table} (
+                source_table text NOT NULL,
+                warehouse_table text NOT NULL,
+                range_index integer NOT NULL,
+                run_id text NOT NULL,
+                mode text NOT NULL,
+                date_filter text,
+                strategy text NOT NULL,
+                key_columns jsonb,
+                range_stop jsonb,
+                position jsonb,
+                rows_transferred bigint NOT NULL DEFAULT 0,
+                completed boolean NOT NULL DEFAULT false,
+                updated_at timestamptz NOT NULL DEFAULT now(),
+                PRIMARY KEY (source_table, warehouse_table, range_index)
+            )
+        """)
+
+    def load(self, dest_conn, source_table: str, warehouse_table: str) -> List[Dict[str, Any]]:
+        """Return the checkpoint rows of the last run for this table pair, ordered by range"""
+        with dest_conn.cursor() as cursor:
+            cursor.execute(f"""
+                SELECT range_index, run_id, mode, date_filter, strategy, key_columns,
+                       range_stop, position, rows_transferred, completed
+                FROM {self.table}
+                WHERE source_table = %s AND warehouse_table = %s
+                ORDER BY range_index
+            """, (source_table, warehouse_table))
+            columns = [desc[0] for desc in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def start(self, dest_cursor, source_table: str, warehouse_table: str, mode: str,
+              date_filter: Optional[str], plan: tuple) -> str:
+        """Replace any previous checkpoints for the table pair with the ranges of a new run"""
+        strategy, key_columns, ranges = plan
+        run_id = uuid.uuid4().hex
+        dest_cursor.execute(
+            f"DELETE FROM {self.table} WHERE source_table = %s AND warehouse_table = %s",
+            (source_table, warehouse_table)
+        )
+        for range_index, (start, stop) in enumerate(ranges):
+            dest_cursor.execute(f"""
+                INSERT INTO {self.table}
+                    (source_table, warehouse_table, range_index, run_id, mode, date_filter,
+                     strategy, key_columns, range_stop, position)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, (
+                source_table, warehouse_table, range_index, run_id, mode, date_filter,
+                strategy, json.dumps(key_columns), self.encode(stop), self.encode(start)
+            ))
+        return run_id
+
+    def advance(self, dest_cursor, source_table: str, warehouse_table: str, range_index: int, position, rows: int, completed: bool = False):
+        """Record a committed batch; call inside the batch's transaction"""
+        dest_cursor.execute(f"""
+            UPDATE {self.table}
+            SET position = %s, rows_transferred = rows_transferred + %s, completed = %s, updated_at = now()
+            WHERE source_table = %s AND warehouse_table = %s AND range_index = %s
+        """, (self.encode(position), rows, completed, source_table, warehouse_table, range_index))
+
+    def complete(self, dest_cursor, source_table: str, warehouse_table: str, range_index: int):
+        dest_cursor.execute(f"""
+            UPDATE {self.table} SET completed = true, updated_at = now()
+            WHERE source_table = %s AND warehouse_table = %s AND range_index = %s
+        """, (source_table, warehouse_table, range_index))
+
+    @staticmethod
+    def encode(position) -> str:
+        """Serialize a range position: key tuples as lists of text, pages and offsets as integers"""
+        if isinstance(position, tuple):
+            return json.dumps([None if value is None else str(value) for value in position])
+        return json.dumps(position)
+
+    @staticmethod
+    def decode(strategy: str, value):
+        """Turn a stored position back into the form _iter_batch_queries expects"""
+        if value is None:
+            return None
+        return tuple(value) if strategy == 'keyset' else int(value)
+
+class WatermarkStore:
+    """
+    Control table on the destination holding, per source/warehouse table pair,
+    the highest value of the watermark column that has been loaded successfully.
+    Values are kept as PostgreSQL's own text rendering so they cast back exactly.
+    """
+
+    def __init__(self, schema: str, table: str = 'transfer_watermarks'):
+        self.table = f"{schema}.{table}"
+
+    def ensure_table(self, dest_conn):
+        create_if_not_exists(dest_conn, f"""
+            CREATE TABLE IF NOT EXISTS {self.table} (
+                source_table text NOT NULL,
+                warehouse_table text NOT NULL,
+                column_name text NOT NULL,
+                watermark text NOT NULL,
+                updated_at timestamptz NOT NULL DEFAULT now(),
+                PRIMARY KEY (source_table, warehouse_table, column_name)
+            )
+        """)
+
+    def get(self, dest_conn, source_table: str, warehouse_table: str, column_name: str) -> Optional[str]:
+        with dest_conn.cursor() as cursor:
+            cursor.execute(
+                f"SELECT watermark FROM {self.table} WHERE source_table = %s AND warehouse_table = %s AND column_name = %s",
+                (source_table, warehouse_table, column_name)
+            )
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+    def set(self, dest_conn, source_table: str, warehouse_table: str, column_name: str, watermark: str):
+        with dest_conn.cursor() as cursor:
+            cursor.execute(f"""
+                INSERT INTO {self.table} (source_table, warehouse_table, column_name, watermark)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (source_table, warehouse_table, column_name)
+                DO UPDATE SET watermark = EXCLUDED.watermark, updated_at = now()
+            """, (source_table, warehouse_table, column_name, watermark))
+        dest_conn.commit()
+
+class BatchSizer:
+    """
+    Picks the row count of each batch of one range. A fixed sizer always returns
+    its initial size. An adaptive one hill-climbs on rows/sec, measured over at
+    least sample_seconds of batches per size: it keeps stepping the size the same
+    way while throughput improves by more than tolerance, turns back with a
+    smaller step when throughput drops, and settles once a step no longer pays
+    off. The size stays within [min_size, max_size] and, once bytes per row are
+    known, below memory_limit bytes per batch.
+    """
+
+    def __init__(self, initial: int, min_size: int = 1, max_size: Optional[int] = None,
+                 memory_limit: Optional[int] = None, adaptive: bool = False, tolerance: float = 0.1,
+                 sample_seconds: float = 1.0):
+        self.adaptive = adaptive
+        self.min_size = max(1, min_size)
+        self.max_size = max(self.min_size, max_size or initial)
+        self.memory_limit = memory_limit
+        self.tolerance = tolerance
+        self.sample_seconds = sample_seconds
+        self.bytes_per_row = None
+        self.settled = not adaptive
+        self._size = min(max(initial, self.min_size), self.max_size) if adaptive else max(1, initial)
+        self._step = 2.0
+        self._direction = 1
+        self._last_rate = None
+        self._sample_rows = 0
+        self._sample_seconds = 0.0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def observe(self, rows: int, seconds: float, batch_bytes: Optional[int] = None):
+        """Record one loaded batch and size the batches requested after it"""
+        if not self.adaptive or rows <= 0:
+            return
+        if batch_bytes:
+            per_row = batch_bytes / rows
+            self.bytes_per_row = per_row if self.bytes_per_row is None else 0.7 * self.bytes_per_row + 0.3 * per_row
+
+        size = self._size
+        # Only batches close to the current size measure it; range tails and batches
+        # prefetched before the last change would skew the comparison
+        if not self.settled and size / 1.5 <= rows <= size * 1.5:
+            self._sample_rows += rows
+            self._sample_seconds += seconds
+        if not self.settled and self._sample_seconds >= self.sample_seconds:
+            rate = self._sample_rows / self._sample_seconds
+            self._sample_rows, self._sample_seconds = 0, 0.0
+            if self._last_rate is not None:
+                if rate < self._last_rate * (1 - self.tolerance):
+                    self._direction = -self._direction
+                    self._step = self._step ** 0.5
+                elif rate <= self._last_rate * (1 + self.tolerance):
+                    self.settled = True
+            self.settled = self.settled or self._step < 1.1
+            self._last_rate = rate
+            if not self.settled:
+                size = int(size * self._step) if self._direction > 0 else int(size / self._step)
+        self._resize(size)
+
+    def _resize(self, size: int):
+        size = min(max(size, self.min_size), self.max_size)
+        if self.memory_limit and self.bytes_per_row:
+            limit = int(self.memory_limit / self.bytes_per_row)
+            if size > limit:
+                # Leave headroom so small changes in row width do not resize every batch
+                size = max(self.min_size, int(limit * 0.9))
+        if size != self._size:
+            self._sample_rows, self._sample_seconds = 0, 0.0
+            logger.info(f"Batch size {self._size:,} -> {size:,} rows"
+                        f"{f' ({self._last_rate:,.0f} rows/s)' if self._last_rate else ''}")
+            self._size = size
+
+class MemoryProfiler:
+    """
+    tracemalloc report of Python allocations over one transfer: the traced total
+    after each batch with its change since the previous batch, the run's peak,
+    and at the end the allocation sites still holding the most memory. Memory
+    that stays flat from batch to batch shows nothing accumulates between them.
+    Tracing is process wide and slows allocation heavy code, hence MEMORY_PROFILE.
+    """
+
+    def __init__(self, top_sites: int = 5):
+        self.top_sites = top_sites
+        self._lock = threading.Lock()
+        self._owns_tracing = False
+        self._first = None
+        self._last = 0
+
+    def start(self):
+        # Another transfer may already be tracing; share its trace rather than stopping it under it
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracing = True
+        tracemalloc.reset_peak()
+        self._last = tracemalloc.get_traced_memory()[0]
+
+    def sample(self, label: str):
+        """Log the traced memory after a batch"""
+        current, peak = tracemalloc.get_traced_memory()
+        with self._lock:
+            delta, self._last = current - self._last, current
+            if self._first is None:
+                self._first = current
+        logger.info(f"{label} memory: {current / (1024 * 1024):.1f} MB traced ({delta / (1024 * 1024):+.2f} MB), peak {peak / (1024 * 1024):.1f} MB")
+
+    def stop(self):
+        """Log the run's peak, the growth since the first batch and the largest live allocation sites"""
+        if not tracemalloc.is_tracing():
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        growth = current - self._first if self._first is not None else 0
+        logger.info(f"Memory profile: peak {peak / (1024 * 1024):.1f} MB, {current / (1024 * 1024):.1f} MB traced at the end ({growth / (1024 * 1024):+.2f} MB since the first batch)")
+        for stat in tracemalloc.take_snapshot().statistics('lineno')[:self.top_sites]:
+            logger.info(f"  {stat.size / (1024 * 1024):.2f} MB in {stat.count:,} blocks at {stat.traceback}")
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+class TransferSettings:
+    """
+    Settings for one PostgreSQLDataTransfer, keyed by the environment variable
+    names documented in the README. Values passed in win; anything missing falls
+    back to the process environment, so .env driven runs behave as before while
+    concurrent API requests each carry their own settings.
+    """
+
+    def __init__(self, values: Optional[Dict[str, Any]] = None):
+        self.values = {name: value for name, value in (values or {}).items() if value is not None}
+
+    def get(self, name: str, default: str) -> str:
+        if name not in self.values:
+            return os.getenv(name, default)
+        value = self.values[name]
+        return str(value).lower() if isinstance(value, bool) else str(value)
+
+class PostgreSQLDataTransfer:
+    def __init__(self, settings: Optional[TransferSettings] = None, cancel_token: Optional[CancellationToken] = None):
+        self.settings = settings or TransferSettings()
+        self.cancel_token = cancel_token or CancellationToken()
+        setting = self.settings.get
+        
         # Source Database Configuration
         self.source_config = {
-            'host': os.getenv('SOURCE_HOST', 'source-rds-endpoint.amazonaws.com'),
-            'port': os.getenv('SOURCE_PORT', '5432'),
-            'database': os.getenv('SOURCE_DB', 'source_database'),
-            'user': os.getenv('SOURCE_USER', 'your_username'),
-            'password': os.getenv('SOURCE_PASSWORD', 'your_password')
+            'host': setting('SOURCE_HOST', 'source-rds-endpoint.amazonaws.com'),
+            'port': setting('SOURCE_PORT', '5432'),
+            'database': setting('SOURCE_DB', 'source_database'),
+            'user': setting('SOURCE_USER', 'your_username'),
+            'password': setting('SOURCE_PASSWORD', 'your_password')
         }
         
         # Add SSL configuration for AWS RDS
@@ -37,22 +753,63 @@ class PostgreSQLDataTransfer:
         
         # Destination Database Configuration
         self.dest_config = {
-            'host': os.getenv('DEST_HOST', 'warehouse-rds-endpoint.amazonaws.com'),
-            'port': os.getenv('DEST_PORT', '5432'),
-            'database': os.getenv('DEST_DB', 'warehouse_database'),
-            'user': os.getenv('DEST_USER', 'warehouse_username'),
-            'password': os.getenv('DEST_PASSWORD', 'warehouse_password')
+            'host': setting('DEST_HOST', 'warehouse-rds-endpoint.amazonaws.com'),
+            'port': setting('DEST_PORT', '5432'),
+            'database': setting('DEST_DB', 'warehouse_database'),
+            'user': setting('DEST_USER', 'warehouse_username'),
+            'password': setting('DEST_PASSWORD', 'warehouse_password')
         }
         
         # Add SSL configuration for AWS RDS
         self._add_ssl_config(self.dest_config)
         
         # Transfer Configuration
-        self.batch_size = int(os.getenv('BATCH_SIZE', '10000'))  # Process 10k rows at a time
-        self.table_name = os.getenv('TABLE_NAME', 'your_table_name')
-        self.warehouse_table = os.getenv('WAREHOUSE_TABLE', 'your_warehouse_table')
-        self.source_db_schema = os.getenv('SOURCE_DB_SCHEMA', 'public')
-        self.dest_db_schema = os.getenv('DEST_DB_SCHEMA', 'my')
+        self.batch_size = int(setting('BATCH_SIZE', '10000'))  # Process 10k rows at a time
+        self.adaptive_batch_size = setting('ADAPTIVE_BATCH_SIZE', 'false').lower() == 'true'  # Tune the batch size from BATCH_SIZE per range
+        self.batch_size_min = int(setting('BATCH_SIZE_MIN', '1000'))
+        self.batch_size_max = int(setting('BATCH_SIZE_MAX', '500000'))
+        self.batch_memory_mb = int(setting('BATCH_MEMORY_MB', '256'))  # Ceiling on one adaptive batch held in memory
+        self.memory_profile = setting('MEMORY_PROFILE', 'false').lower() == 'true'  # Log tracemalloc figures per batch
+        self.verify_method = setting('VERIFY_METHOD', 'count').lower()  # 'count' or 'checksum' (per key range, names differing rows)
+        self.verify_ranges = int(setting('VERIFY_RANGES', '16'))  # Ranges per checksum pass, and sub-ranges per differing range
+        self.verify_workers = int(setting('VERIFY_WORKERS', '4'))  # Concurrent checksum queries across both databases
+        self.verify_leaf_rows = int(setting('VERIFY_LEAF_ROWS', '1000'))  # Differing ranges this small are compared row by row
+        self.last_verification = None
+        self.table_name = setting('TABLE_NAME', 'your_table_name')
+        self.warehouse_table = setting('WAREHOUSE_TABLE', 'your_warehouse_table')
+        self.source_db_schema = setting('SOURCE_DB_SCHEMA', 'public')
+        self.dest_db_schema = setting('DEST_DB_SCHEMA', 'my')
+        self.pagination_mode = setting('PAGINATION_MODE', 'auto').lower()  # 'auto', 'keyset', 'ctid' or 'offset'
+        self.parallelism = int(setting('PARALLELISM', '1'))  # Range workers, each with its own connection pair
+        self.direct_full_load = setting('DIRECT_FULL_LOAD', 'true').lower() == 'true'  # COPY straight into the target in full mode
+        self.full_load_strategy = setting('FULL_LOAD_STRATEGY', 'truncate').lower()  # 'truncate' in place or 'swap' in a shadow table
+        if self.full_load_strategy not in ('truncate', 'swap'):
+            logger.warning(f"Unknown FULL_LOAD_STRATEGY '{self.full_load_strategy}'; using truncate")
+            self.full_load_strategy = 'truncate'
+        self.swap_lock_timeout_ms = int(setting('SWAP_LOCK_TIMEOUT_MS', '5000'))  # Longest wait for readers before retrying a swap
+        self.defer_indexes = setting('DEFER_INDEXES', 'false').lower() == 'true'  # Drop indexes and constraints for full loads, rebuild after
+        self.index_build_workers = int(setting('INDEX_BUILD_WORKERS', '2'))  # Indexes built at once after a full load
+        self.maintenance_work_mem = setting('MAINTENANCE_WORK_MEM', '')  # Per-build memory, e.g. 1GB; empty keeps the server default
+        self.upsert_method = setting('UPSERT_METHOD', 'insert').lower()  # insert (ON CONFLICT) or merge (PG15+)
+        if self.upsert_method not in ('insert', 'merge'):
+            logger.warning(f"Unknown UPSERT_METHOD '{self.upsert_method}'; using insert")
+            self.upsert_method = 'insert'
+        self.resume = setting('RESUME', 'false').lower() == 'true'  # Continue from the last committed batch of a failed run
+        self.watermark_column = setting('WATERMARK_COLUMN', 'updated_at')  # Monotonic column driving daily incremental runs
+        self.watermark_overlap_minutes = int(setting('WATERMARK_OVERLAP_MINUTES', '10'))  # Re-read window for late-arriving rows
+        self.watermarks = WatermarkStore(self.dest_db_schema, setting('WATERMARK_TABLE', 'transfer_watermarks'))
+        self.checkpoints = CheckpointStore(self.dest_db_schema, setting('CHECKPOINT_TABLE', 'transfer_checkpoints'))
+        self.transfer_method = setting('TRANSFER_METHOD', 'batch').lower()  # 'batch' (fetch + CSV) or 'stream' (COPY to COPY)
+        self.stream_buffer_mb = int(setting('STREAM_BUFFER_MB', '16'))  # Bytes buffered between source and destination COPY
+        self.copy_format = setting('COPY_FORMAT', 'text').lower()  # 'text', 'csv' or 'binary' for streamed COPY
+        self.pipeline_depth = int(setting('PIPELINE_DEPTH', '0'))  # Batches fetched ahead of the destination load; 0 runs them in turn
+        
+        # Binary COPY cannot be produced from Python tuples, only passed through end to end
+        if self.copy_format == 'binary' and self.transfer_method != 'stream':
+            logger.warning("COPY_FORMAT=binary requires TRANSFER_METHOD=stream; switching to stream")
+            self.transfer_method = 'stream'
+        if self.pipeline_depth > 0 and self.transfer_method == 'stream':
+            logger.info("PIPELINE_DEPTH only applies to TRANSFER_METHOD=batch; streamed COPY already overlaps both sides")
     
     def _add_ssl_config(self, config: dict):
         """Add SSL configuration for AWS RDS connections"""
@@ -61,7 +818,7 @@ class PostgreSQLDataTransfer:
             logger.info(f"Adding SSL configuration for AWS RDS host: {config['host']}")
             
             # Try different SSL modes for AWS RDS
-            ssl_mode = os.getenv('SSL_MODE', 'require').lower()
+            ssl_mode = self.settings.get('SSL_MODE', 'require').lower()
             
             config.update({
                 'sslmode': ssl_mode,  # 'require', 'verify-ca', 'verify-full', 'prefer'
@@ -95,64 +852,28 @@ class PostgreSQLDataTransfer:
         
     @contextmanager
     def get_connection(self, config: dict, autocommit: bool = False):
-        """Context manager for database connections with enhanced error handling"""
-        conn = None
-        max_retries = 3
-        retry_delay = 5
-        
-        # Try to establish connection with retries
-        for attempt in range(max_retries):
-            try:
-                logger.info(f"Attempting to connect to {config['host']}:{config['port']} (attempt {attempt + 1}/{max_retries})")
-                conn = psycopg2.connect(**config)
-                if autocommit:
-                    conn.autocommit = True
-                
-                # Test the connection
-                with conn.cursor() as cursor:
-                    cursor.execute("SELECT 1")
-                    cursor.fetchone()
-                
-                logger.info(f"Successfully connected to {config['host']}")
-                break  # Connection successful, exit retry loop
-                
-            except psycopg2.OperationalError as e:
-                if conn:
-                    conn.close()
-                    conn = None
-                
-                if "SSL connection has been closed unexpectedly" in str(e):
-                    logger.error(f"SSL connection error (attempt {attempt + 1}/{max_retries}): {e}")
-                    if attempt < max_retries - 1:
-                        logger.info(f"Retrying in {retry_delay} seconds...")
-                        time.sleep(retry_delay)
-                        retry_delay *= 2  # Exponential backoff
-                    else:
-                        logger.error("Max retries reached. SSL connection failed.")
-                        raise
-                else:
-                    logger.error(f"Database connection error: {e}")
-                    raise
-                    
-            except Exception as e:
-                if conn:
-                    conn.close()
-                    conn = None
-                logger.error(f"Database connection error: {e}")
-                raise
-        
-        # If we get here, we have a successful connection
-        if conn is None:
-            raise Exception("Failed to establish database connection after all retries")
-        
+        """
+        Context manager that checks a connection out of the process-wide pool
+        for config and returns it when the block exits. While checked out the
+        connection is registered with the cancel token, and a statement the
+        token cancelled on the server surfaces as TransferCancelled rather than
+        QueryCanceled, whatever phase of the job it was in.
+        """
+        self.cancel_token.raise_if_cancelled()
+        pool = get_connection_pool(config)
+        conn = pool.acquire()
         try:
+            self.cancel_token.register(conn)
+            if autocommit:
+                conn.autocommit = True
             yield conn
+        except psycopg2.errors.QueryCanceled as e:
+            if self.cancel_token.cancelled:
+                raise TransferCancelled("Transfer cancelled") from e
+            raise
         finally:
-            if conn:
-                try:
-                    conn.close()
-                except Exception as e:
-                    logger.warning(f"Error closing connection: {e}")
+            self.cancel_token.unregister(conn)
+            pool.release(conn)
 
     def get_total_rows(self, date_filter: Optional[str] = None) -> int:
         """Get total number of rows to transfer"""
@@ -179,16 +900,48 @@ class PostgreSQLDataTransfer:
                 cursor.execute(query)
                 return [row[0] for row in cursor.fetchall()]
 
-    def get_tables_and_views(self, schema_name: str) -> List[Dict[str, Any]]:
-        """Get all tables and views from a specific schema"""
-        query = """
+    def get_tables_and_views(self, schema_name: str, exact_counts: bool = False) -> List[Dict[str, Any]]:
+        """
+        Get all tables and views from a specific schema.
+        
+        Row counts are estimated from pg_class.reltuples (scaled to the table's
+        current size) or pg_stat_user_tables.n_live_tup, so listing a schema is a
+        single catalog query. Pass exact_counts=True to run COUNT(*) per table.
+        Partitions are listed too, flagged with is_partition, since their
+        partitioned parent already covers their rows.
+        """
+        estimate = """
+            CASE WHEN {c}.relpages > 0
+                 THEN {c}.reltuples / {c}.relpages * (pg_relation_size({c}.oid) / current_setting('block_size')::int)
+                 ELSE COALESCE({s}.n_live_tup, GREATEST({c}.reltuples, 0))
+            END
+        """
+        query = f"""
         SELECT 
-            table_name,
-            table_type,
-            (SELECT COUNT(*) FROM information_schema.columns WHERE table_schema = t.table_schema AND table_name = t.table_name) as column_count
-        FROM information_schema.tables t
-        WHERE table_schema = %s
-        ORDER BY table_name
+            c.relname,
+            c.relkind,
+            c.relispartition,
+            CASE c.relkind
+                WHEN 'r' THEN ({estimate.format(c='c', s='s')})::bigint
+                WHEN 'p' THEN (
+                    SELECT sum({estimate.format(c='pc', s='ps')})::bigint
+                    FROM pg_partition_tree(c.oid) t
+                    JOIN pg_class pc ON pc.oid = t.relid
+                    LEFT JOIN pg_stat_user_tables ps ON ps.relid = pc.oid
+                    WHERE t.isleaf
+                )
+            END AS row_estimate,
+            count(a.attnum) AS column_count
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+        LEFT JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+        WHERE n.nspname = %s
+          AND c.relkind IN ('r', 'p', 'v', 'f')
+          AND (pg_has_role(c.relowner, 'USAGE')
+               OR has_table_privilege(c.oid, 'SELECT, INSERT, UPDATE, DELETE, TRUNCATE, REFERENCES, TRIGGER'))
+        GROUP BY c.oid, c.relname, c.relkind, c.relispartition, s.n_live_tup
+        ORDER BY c.relname
         """
         
         with self.get_connection(self.source_config) as conn:
@@ -198,23 +951,27 @@ class PostgreSQLDataTransfer:
                 
                 tables_and_views = []
                 for row in results:
-                    table_name, table_type, column_count = row
+                    table_name, relkind, is_partition, row_count, column_count = row
+                    is_table = relkind in ('r', 'p')
                     
-                    # Get row count for tables (not views)
-                    row_count = None
-                    if table_type == 'BASE TABLE':
+                    # Get exact row count for tables (not views) only when asked
+                    if exact_counts and is_table:
                         try:
-                            count_query = f"SELECT COUNT(*) FROM {schema_name}.{table_name}"
+                            count_query = f"SELECT COUNT(*) FROM {schema_name}.{quote_ident(table_name)}"
                             cursor.execute(count_query)
                             row_count = cursor.fetchone()[0]
                         except Exception as e:
+                            conn.rollback()
+                            row_count = None
                             logger.warning(f"Could not get row count for {schema_name}.{table_name}: {e}")
                     
                     tables_and_views.append({
                         "table_name": table_name,
-                        "table_type": "table" if table_type == "BASE TABLE" else "view",
+                        "table_type": "table" if is_table else "view",
                         "row_count": row_count,
-                        "column_count": column_count
+                        "row_count_estimated": is_table and not exact_counts,
+                        "column_count": column_count,
+                        "is_partition": is_partition
                     })
                 
                 return tables_and_views
@@ -281,22 +1038,26 @@ class PostgreSQLDataTransfer:
                 }
 
     def create_warehouse_table_if_not_exists(self, source_table_structure: str):
-        """Create warehouse schema and table with the same structure as the source."""
-        create_schema_query = f"CREATE SCHEMA IF NOT EXISTS {self.dest_db_schema};"
-        
-        create_table_query = f"""
-        CREATE TABLE IF NOT EXISTS {self.dest_db_schema}.{self.warehouse_table} AS
-        SELECT * FROM {self.source_db_schema}.{self.table_name} WHERE 1=0;
         """
+        Create warehouse schema and table with the same structure as the source:
+        the DDL is generated from the source catalog (see _source_table_ddl), so
+        the two databases need not be the same, and applied in one transaction.
+        """
+        create_schema_query = f"CREATE SCHEMA IF NOT EXISTS {self.dest_db_schema};"
         
         try:
+            with self.get_connection(self.source_config) as source_conn:
+                with source_conn.cursor() as source_cursor:
+                    create_table_statements = self._source_table_ddl(source_cursor)
+                source_conn.commit()
+            
             with self.get_connection(self.dest_config, autocommit=True) as conn:
+                # Create schema if it doesn't exist
+                logger.info(f"Ensuring schema '{self.dest_db_schema}' exists...")
+                create_if_not_exists(conn, create_schema_query)
+                logger.info(f"Schema '{self.dest_db_schema}' is ready.")
+                
                 with conn.cursor() as cursor:
-                    # Create schema if it doesn't exist
-                    logger.info(f"Ensuring schema '{self.dest_db_schema}' exists...")
-                    cursor.execute(create_schema_query)
-                    logger.info(f"Schema '{self.dest_db_schema}' is ready.")
-
                     # Check if table exists
                     cursor.execute(f"""
                         SELECT 1 FROM information_schema.tables 
@@ -305,7 +1066,8 @@ class PostgreSQLDataTransfer:
                     
                     if not cursor.fetchone():
                         logger.info(f"Table '{self.warehouse_table}' not found in schema '{self.dest_db_schema}'. Creating...")
-                        cursor.execute(create_table_query)
+                        # One query string runs as one transaction, so a failed partition or index leaves no table behind
+                        create_if_not_exists(conn, ";\n".join(create_table_statements))
                         logger.info(f"Table '{self.warehouse_table}' created successfully.")
                     else:
                         logger.info(f"Table '{self.warehouse_table}' already exists in schema '{self.dest_db_schema}'.")
@@ -314,12 +1076,418 @@ class PostgreSQLDataTransfer:
             logger.error(f"Error during schema/table creation: {e}")
             raise
 
+    def _source_table_ddl(self, cursor) -> List[str]:
+        """
+        Statements creating the warehouse table from the source table's catalog
+        entries: its columns with their exact types, collations and NOT NULL,
+        its primary key and unique constraints, its unique indexes and, for a
+        partitioned table, its partition key and every partition down the tree.
+        Defaults, checks, foreign keys and plain indexes are left out; rows
+        arrive complete and already validated by the source. Domains are
+        created as their base type and enums as text, since neither need exist
+        in the warehouse.
+        """
+        source_table = f"{self.source_db_schema}.{self.table_name}"
+        target_table = f"{self.dest_db_schema}.{self.warehouse_table}"
+        
+        cursor.execute("""
+            SELECT a.attname, a.attnotnull,
+                   CASE WHEN e.typtype = 'e' THEN CASE WHEN t.typcategory = 'A' THEN 'text[]' ELSE 'text' END
+                        WHEN t.typtype = 'd' THEN format_type(t.typbasetype, t.typtypmod)
+                        ELSE format_type(a.atttypid, a.atttypmod) END,
+                   CASE WHEN a.attcollation <> t.typcollation THEN quote_ident(co.collname) END
+            FROM pg_attribute a
+            JOIN pg_type t ON t.oid = a.atttypid
+            JOIN pg_type e ON e.oid = CASE WHEN t.typcategory = 'A' THEN t.typelem ELSE t.oid END
+            LEFT JOIN pg_collation co ON co.oid = a.attcollation
+            WHERE a.attrelid = %s::regclass AND a.attnum > 0 AND NOT a.attisdropped
+            ORDER BY a.attnum
+        """, (source_table,))
+        definitions = [
+            f"{quote_ident(name)} {data_type}{f' COLLATE {collation}' if collation else ''}{' NOT NULL' if not_null else ''}"
+            for name, not_null, data_type, collation in cursor.fetchall()
+        ]
+        
+        cursor.execute("""
+            SELECT pg_get_constraintdef(oid) FROM pg_constraint
+            WHERE conrelid = %s::regclass AND contype IN ('p', 'u')
+            ORDER BY contype, conname
+        """, (source_table,))
+        definitions += [definition for (definition,) in cursor.fetchall()]
+        
+        cursor.execute("SELECT relkind, pg_get_partkeydef(oid) FROM pg_class WHERE oid = %s::regclass", (source_table,))
+        relkind, partition_key = cursor.fetchone()
+        statements = [
+            f"CREATE TABLE IF NOT EXISTS {target_table} (\n    " + ",\n    ".join(definitions) + "\n)"
+            + (f" PARTITION BY {partition_key}" if relkind == 'p' else "")
+        ]
+        
+        # pg_get_indexdef reads "CREATE UNIQUE INDEX name ON table USING method (...)"; left unnamed, the warehouse picks a free name
+        cursor.execute("""
+            SELECT regexp_replace(pg_get_indexdef(x.indexrelid), '^.*? USING ', '')
+            FROM pg_index x
+            WHERE x.indrelid = %s::regclass AND x.indisunique AND x.indisvalid
+              AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid AND c.conrelid = x.indrelid)
+            ORDER BY x.indexrelid
+        """, (source_table,))
+        statements += [f"CREATE UNIQUE INDEX ON {target_table} USING {definition}" for (definition,) in cursor.fetchall()]
+        
+        if relkind == 'p':
+            # Partitions are named after the warehouse table the way they are named after the source table
+            cursor.execute("""
+                WITH RECURSIVE tree AS (
+                    SELECT inhrelid AS oid, inhparent AS parent, 1 AS depth FROM pg_inherits WHERE inhparent = %s::regclass
+                    UNION ALL
+                    SELECT i.inhrelid, i.inhparent, tree.depth + 1 FROM pg_inherits i JOIN tree ON i.inhparent = tree.oid
+                )
+                SELECT c.relname, p.relname, c.relkind, pg_get_expr(c.relpartbound, c.oid), pg_get_partkeydef(c.oid)
+                FROM tree
+                JOIN pg_class c ON c.oid = tree.oid
+                JOIN pg_class p ON p.oid = tree.parent
+                WHERE c.relispartition
+                ORDER BY tree.depth, c.relname
+            """, (source_table,))
+            
+            def warehouse_name(name: str) -> str:
+                if name == self.table_name:
+                    return target_table
+                if name.startswith(self.table_name):
+                    name = self.warehouse_table + name[len(self.table_name):]
+                return f"{self.dest_db_schema}.{quote_ident(name)}"
+            
+            for name, parent, child_relkind, bound, child_partition_key in cursor.fetchall():
+                statements.append(
+                    f"CREATE TABLE IF NOT EXISTS {warehouse_name(name)} PARTITION OF {warehouse_name(parent)} {bound}"
+                    + (f" PARTITION BY {child_partition_key}" if child_relkind == 'p' else "")
+                )
+        
+        return statements
+
+    def get_pagination_key(self, cursor) -> Optional[List[str]]:
+        """
+        Find the source table's primary key, or failing that the narrowest
+        unique index whose columns are all NOT NULL, for keyset pagination
+        """
+        query = """
+        SELECT array_agg(a.attname::text ORDER BY k.ord)
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        CROSS JOIN LATERAL unnest(i.indkey) WITH ORDINALITY AS k(attnum, ord)
+        JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum = k.attnum
+        WHERE n.nspname = %s AND c.relname = %s
+          AND i.indisunique AND i.indisvalid
+          AND i.indpred IS NULL AND i.indexprs IS NULL
+          AND k.ord <= i.indnkeyatts
+        GROUP BY i.indexrelid, i.indisprimary
+        HAVING bool_and(a.attnotnull)
+        ORDER BY i.indisprimary DESC, count(*), i.indexrelid
+        LIMIT 1
+        """
+        cursor.execute(query, (self.source_db_schema, self.table_name))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def _resolve_pagination(self, cursor) -> Tuple[str, Optional[List[str]]]:
+        """Pick the paging strategy for the source table: keyset, ctid or offset"""
+        cursor.execute(
+            """
+            SELECT c.relkind FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = %s AND c.relname = %s
+            """,
+            (self.source_db_schema, self.table_name)
+        )
+        row = cursor.fetchone()
+        relkind = row[0] if row else None
+
+        # ctid ranges only make sense on a single heap; partitions and views have no usable ctid order.
+        # Before PostgreSQL 14 there is no TID range scan, so every ctid batch would read the whole heap
+        ctid_usable = relkind in ('r', 'm') and cursor.connection.server_version >= 140000
+        if self.pagination_mode == 'ctid' and not ctid_usable:
+            logger.warning(f"ctid paging needs a plain table on PostgreSQL 14+ (source is {cursor.connection.server_version}); "
+                           f"trying keyset paging for {self.source_db_schema}.{self.table_name}")
+
+        if self.pagination_mode in ('auto', 'keyset') or (self.pagination_mode == 'ctid' and not ctid_usable):
+            key_columns = self.get_pagination_key(cursor) if relkind in ('r', 'p', 'm') else None
+            if key_columns:
+                return 'keyset', key_columns
+            logger.warning(f"No primary key or NOT NULL unique index on {self.source_db_schema}.{self.table_name}")
+
+        if self.pagination_mode in ('auto', 'keyset', 'ctid') and ctid_usable:
+            return 'ctid', None
+
+        if self.pagination_mode != 'offset':
+            logger.warning(f"Falling back to LIMIT/OFFSET paging for {self.source_db_schema}.{self.table_name}")
+        return 'offset', None
+
+    def _build_where(self, date_filter: Optional[str], conditions: List[str]) -> str:
+        """Combine the optional date filter with paging conditions into a WHERE clause"""
+        clauses = []
+        if date_filter:
+            # Escape % so the filter survives psycopg2 parameter substitution
+            clauses.append(f"({date_filter.replace('%', '%%')})")
+        clauses.extend(conditions)
+        return f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    def _plan_ranges(self, source_conn, date_filter: Optional[str], total_rows: int) -> Tuple[str, Optional[List[str]], list]:
+        """
+        Resolve the paging strategy and split the source table into PARALLELISM
+        disjoint ranges. Returns (strategy, key_columns, ranges) where each range is
+        a (start, stop) bound: exclusive/inclusive keys for keyset, a page span for
+        ctid and a starting offset for offset paging. None leaves that side open.
+        """
+        source_table = f"{self.source_db_schema}.{self.table_name}"
+        
+        with source_conn.cursor() as cursor:
+            strategy, key_columns = self._resolve_pagination(cursor)
+            logger.info(f"Paging {source_table} using {strategy} strategy" + (f" on ({', '.join(key_columns)})" if key_columns else ""))
+            
+            whole_table = (None, None) if strategy == 'keyset' else (0, None)
+            partitions = max(1, self.parallelism)
+            if partitions == 1:
+                return strategy, key_columns, [whole_table]
+            
+            if strategy == 'keyset':
+                ranges = self._split_key_ranges(cursor, source_table, key_columns, total_rows, partitions)
+            elif strategy == 'ctid':
+                total_pages, _ = self._get_heap_stats(cursor, source_table)
+                step = max(1, -(-total_pages // partitions))
+                starts = list(range(0, max(total_pages, 1), step))
+                ranges = [(start, starts[i + 1] if i + 1 < len(starts) else None) for i, start in enumerate(starts)]
+            else:
+                logger.warning("LIMIT/OFFSET paging cannot be split into ranges; transferring serially")
+                ranges = [whole_table]
+            
+            logger.info(f"Split {source_table} into {len(ranges)} ranges for parallel transfer")
+            return strategy, key_columns, ranges
+
+    def _split_key_ranges(self, cursor, source_table: str, key_columns: List[str], total_rows: int, partitions: int) -> list:
+        """Pick partition boundaries from a TABLESAMPLE of the key so ranges hold roughly equal rows"""
+        key_list = ', '.join(quote_ident(col) for col in key_columns)
+        cursor.execute("SELECT reltuples FROM pg_class WHERE oid = %s::regclass", (source_table,))
+        estimated_rows = max(cursor.fetchone()[0], total_rows, 1)
+        sample_percent = min(100.0, 100.0 * partitions * 1000 / estimated_rows)
+        
+        cursor.execute(f"SELECT {key_list} FROM {source_table} TABLESAMPLE SYSTEM (%s) ORDER BY {key_list}", (sample_percent,))
+        sample = cursor.fetchall()
+        if len(sample) < partitions:
+            return [(None, None)]
+        
+        boundaries = []
+        for i in range(1, partitions):
+            key = sample[i * len(sample) // partitions]
+            if not boundaries or key != boundaries[-1]:
+                boundaries.append(key)
+        
+        edges = [None] + boundaries + [None]
+        return [(edges[i], edges[i + 1]) for i in range(len(edges) - 1)]
+
+    def _get_heap_stats(self, cursor, source_table: str) -> Tuple[int, float]:
+        """Return the table's current page count and estimated rows per page"""
+        cursor.execute(
+            """
+            SELECT pg_relation_size(c.oid) / current_setting('block_size')::bigint, c.reltuples, c.relpages
+            FROM pg_class c WHERE c.oid = %s::regclass
+            """,
+            (source_table,)
+        )
+        total_pages, reltuples, relpages = cursor.fetchone()
+        rows_per_page = reltuples / relpages if relpages > 0 and reltuples > 0 else 100
+        return total_pages, rows_per_page
+
+    def _iter_batches(self, source_conn, date_filter: Optional[str], total_rows: int, plan: tuple, bounds: tuple,
+                      sizer: BatchSizer):
+        """
+        Yield (query, params, position, batch) for each batch of a range. In batch
+        mode the rows are CSV encoded here, batch being (column_names, csv_buffer,
+        row_count, batch_bytes), and empty batches are skipped; streamed batches
+        carry None and are read by stream_copy when they load.
+        
+        Rows go from the cursor straight into the batch's CSV buffer without
+        being collected into a list, so a batch is freed as soon as the loader
+        drops its buffer and leaves nothing for the garbage collector. batch_bytes
+        estimates the batch's memory (libpq's result plus the CSV) for an
+        adaptive sizer.
+        """
+        for query, params, position in self._iter_batch_queries(source_conn, date_filter, total_rows, plan, bounds, sizer):
+            if self.transfer_method == 'stream':
+                yield query, params, position, None
+                continue
+            
+            with source_conn.cursor() as source_cursor:
+                source_cursor.execute(query, params)
+                batch_rows = source_cursor.rowcount
+                
+                # ctid ranges may cover pages with no live rows
+                if batch_rows <= 0:
+                    continue
+                
+                # Get column names
+                column_names = [desc[0] for desc in source_cursor.description]
+                
+                # Convert batch data to CSV format
+                output = io.StringIO()
+                writer = csv.writer(output)
+                for row_number, row in enumerate(source_cursor):
+                    writer.writerow(row)
+                    if row_number % 10000 == 0:
+                        self.cancel_token.raise_if_cancelled()
+                batch_bytes = 2 * output.tell()
+                output.seek(0)
+            
+            yield query, params, position, (column_names, output, batch_rows, batch_bytes)
+
+    def _iter_batch_queries(self, source_conn, date_filter: Optional[str], total_rows: int, plan: tuple, bounds: tuple, sizer: BatchSizer):
+        """
+        Yield (query, params, position) for each batch within one of the ranges
+        produced by _plan_ranges. position is where the range resumes once the
+        batch is committed (None when the batch runs to the open end).
+
+        Keyset mode probes the index for the key that closes each batch and reads
+        the range (lower, upper], so every batch is an index range scan no matter
+        how deep into the table it is. ctid mode walks the heap in page ranges
+        (TID range scans need PostgreSQL 14+). Offset mode is the last resort for
+        views and key-less partitioned tables.
+        
+        Each batch is sized by sizer.size at the time its query is built.
+        """
+        source_table = f"{self.source_db_schema}.{self.table_name}"
+        strategy, key_columns, _ = plan
+        
+        with source_conn.cursor() as cursor:
+            if strategy == 'keyset':
+                yield from self._iter_keyset_queries(cursor, source_table, key_columns, date_filter, bounds, sizer)
+            elif strategy == 'ctid':
+                yield from self._iter_ctid_queries(cursor, source_table, date_filter, bounds, sizer)
+            else:
+                offset = bounds[0]
+                while offset < total_rows:
+                    batch_size = sizer.size
+                    yield f"SELECT * FROM {source_table}{self._build_where(date_filter, [])} LIMIT {batch_size} OFFSET {offset}", [], offset + batch_size
+                    offset += batch_size
+
+    def _iter_keyset_queries(self, cursor, source_table: str, key_columns: List[str], date_filter: Optional[str], bounds: tuple, sizer: BatchSizer):
+        """Yield keyset batch queries, each bounded by (lower, upper] on the key, within bounds = (lower, stop]"""
+        key_list = ', '.join(quote_ident(col) for col in key_columns)
+        placeholders = ', '.join(['%s'] * len(key_columns))
+        lower, stop = bounds
+        stop_conditions = [f"({key_list}) <= ({placeholders})"] if stop is not None else []
+        stop_params = list(stop) if stop is not None else []
+        
+        while True:
+            conditions = [f"({key_list}) > ({placeholders})"] if lower is not None else []
+            params = list(lower) if lower is not None else []
+            
+            # Probe the index for the last key of this batch
+            cursor.execute(
+                f"SELECT {key_list} FROM {source_table}{self._build_where(date_filter, conditions + stop_conditions)} "
+                f"ORDER BY {key_list} OFFSET {sizer.size - 1} LIMIT 1",
+                params + stop_params
+            )
+            upper = cursor.fetchone()
+            
+            if upper is not None:
+                conditions.append(f"({key_list}) <= ({placeholders})")
+                params.extend(upper)
+            else:
+                conditions.extend(stop_conditions)
+                params.extend(stop_params)
+            
+            yield (
+                f"SELECT * FROM {source_table}{self._build_where(date_filter, conditions)} ORDER BY {key_list}",
+                params,
+                upper if upper is not None else stop
+            )
+            
+            if upper is None:
+                break
+            lower = upper
+
+    def _iter_ctid_queries(self, cursor, source_table: str, date_filter: Optional[str], bounds: tuple, sizer: BatchSizer):
+        """Yield batch queries over consecutive heap page ranges sized to roughly sizer.size rows"""
+        total_pages, rows_per_page = self._get_heap_stats(cursor, source_table)
+        start_page, stop_page = bounds
+        last_page = stop_page if stop_page is not None else total_pages
+        
+        while True:
+            pages_per_batch = max(1, int(sizer.size / rows_per_page))
+            end_page = start_page + pages_per_batch
+            conditions = ["ctid >= %s::tid"]
+            params = [f"({start_page},0)"]
+            if end_page < last_page:
+                conditions.append("ctid < %s::tid")
+                params.append(f"({end_page},0)")
+            elif stop_page is not None:
+                conditions.append("ctid < %s::tid")
+                params.append(f"({stop_page},0)")
+            # Otherwise leave the last range open so rows appended during the run are not lost
+            
+            yield f"SELECT * FROM {source_table}{self._build_where(date_filter, conditions)}", params, (end_page if end_page < last_page else stop_page)
+            
+            if end_page >= last_page:
+                break
+            start_page = end_page
+
+    def get_source_columns(self, source_conn) -> List[str]:
+        """Get the source table's column names in SELECT * order without reading any rows"""
+        with source_conn.cursor() as cursor:
+            cursor.execute(f"SELECT * FROM {self.source_db_schema}.{self.table_name} LIMIT 0")
+            return [desc[0] for desc in cursor.description]
+
+    def stream_copy(self, source_conn, dest_cursor, query: str, params: list, target_table: str, column_names: List[str]) -> int:
+        """
+        Stream the result of query from the source into target_table on the
+        destination. The source COPY runs in a worker thread feeding a bounded
+        CopyStreamPipe, so rows are never decoded into Python objects and memory
+        stays at STREAM_BUFFER_MB no matter how large the batch is.
+        
+        Both sides use COPY_FORMAT. Binary skips the text round trip for numerics,
+        timestamps, bytea and arrays, but needs identical column types on both ends.
+        Returns the number of rows loaded.
+        """
+        pipe = CopyStreamPipe(max_chunks=max(1, self.stream_buffer_mb), cancel_token=self.cancel_token)
+        copy_options = f" WITH (FORMAT {self.copy_format})"
+        column_list = ', '.join(quote_ident(col) for col in column_names)
+        copy_in_query = f"COPY {target_table} ({column_list}) FROM STDIN{copy_options}"
+        
+        with source_conn.cursor() as source_cursor:
+            copy_out_query = f"COPY ({source_cursor.mogrify(query, params).decode()}) TO STDOUT{copy_options}"
+            
+            def produce():
+                error = None
+                try:
+                    source_cursor.copy_expert(copy_out_query, pipe, size=pipe.chunk_size)
+                except BaseException as e:
+                    error = e
+                finally:
+                    pipe.close(error)
+            
+            producer = threading.Thread(target=produce, name="copy-stream-producer", daemon=True)
+            producer.start()
+            try:
+                dest_cursor.copy_expert(copy_in_query, pipe, size=pipe.chunk_size)
+            except Exception:
+                pipe.abort()
+                raise
+            finally:
+                producer.join()
+        
+        logger.info(f"Streamed {dest_cursor.rowcount:,} rows ({pipe.bytes_transferred / (1024 * 1024):.1f} MB)")
+        return dest_cursor.rowcount
+
     def transfer_batch_copy(self, date_filter: Optional[str] = None, mode: str = 'incremental', progress_callback=None):
         """
         Transfer data using COPY command for better performance
         Modes: 'full' - full transfer, 'incremental' - only new/updated records
+        
+        With PARALLELISM > 1 the table is split into disjoint key or ctid ranges
+        and each range runs on its own source/destination connection pair.
+        Raises TransferCancelled when the cancel token fires; every batch committed
+        before that is checkpointed.
         """
         start_time = time.time()
+        profiler = None
         
         try:
             # Get total rows
@@ -330,115 +1498,67 @@ class PostgreSQLDataTransfer:
                 logger.info("No rows to transfer")
                 return True
             
-            # Build base query
-            base_query = f"SELECT * FROM {self.source_db_schema}.{self.table_name}"
-            if date_filter:
-                base_query += f" WHERE {date_filter}"
-           # base_query += " ORDER BY id"  # Assuming 'id' column exists for consistent ordering
+            profiler = MemoryProfiler() if self.memory_profile else None
             
-            transferred_rows = 0
-            batch_number = 1
+            # Progress is shared by all range workers
+            progress = {'transferred_rows': 0, 'batch_number': 0}
+            progress_lock = threading.Lock()
+            
+            def on_batch(batch_rows: int, batch_time: float):
+                with progress_lock:
+                    progress['transferred_rows'] += batch_rows
+                    progress['batch_number'] += 1
+                    transferred_rows, batch_number = progress['transferred_rows'], progress['batch_number']
+                    
+                    # Update progress via callback if provided
+                    if progress_callback:
+                        progress_callback(transferred_rows, batch_number)
+                
+                logger.info(
+                    f"Batch {batch_number}: {batch_rows:,} rows "
+                    f"({transferred_rows:,}/{total_rows:,}) "
+                    f"in {batch_time:.2f}s - "
+                    f"{batch_rows/batch_time:.0f} rows/sec"
+                )
+                if profiler:
+                    profiler.sample(f"Batch {batch_number}")
+            
+            if profiler:
+                profiler.start()
             
             with self.get_connection(self.source_config) as source_conn:
                 with self.get_connection(self.dest_config) as dest_conn:
+                    self.checkpoints.ensure_table(dest_conn)
+                    resumed = self._resume_plan(dest_conn, mode, date_filter) if self.resume else None
                     
-                    # Clear warehouse table if full transfer
-                    if mode == 'full':
-                        with dest_conn.cursor() as dest_cursor:
-                            logger.info(f"TRUNCATE TABLE {self.dest_db_schema}.{self.warehouse_table}")
-                            dest_cursor.execute(f"TRUNCATE TABLE {self.dest_db_schema}.{self.warehouse_table}")
-                            dest_conn.commit()
-                            logger.info("Warehouse table truncated for full transfer")
-                    
-                    # Process in batches
-                    offset = 0
-                    while offset < total_rows:
-                        batch_start_time = time.time()                        
-                       
-                        # Fetch batch from source
-                        query = f"{base_query} LIMIT {self.batch_size} OFFSET {offset}"
-                        
-                        logger.info(f" Batch {batch_number} : {query}")
-
-                        with source_conn.cursor() as source_cursor:
-                            source_cursor.execute(query)
-                            batch_data = source_cursor.fetchall()
-                            
-                            if not batch_data:
-                                break
-                            
-                            # Get column names
-                            column_names = [desc[0] for desc in source_cursor.description]
+                    if resumed:
+                        plan, ranges, progress['transferred_rows'] = resumed
+                    else:
+                        plan = self._plan_ranges(source_conn, date_filter, total_rows)
+                        ranges = list(enumerate(plan[2]))
                         
-                        # Insert batch into warehouse using COPY
                         with dest_conn.cursor() as dest_cursor:
-                            # Create a temporary table for batch processing
-                            temp_table = f"temp_{self.warehouse_table}_{batch_number}"
-                            
-                            logger.info(f"Creating temp table : CREATE TEMP TABLE {temp_table} AS SELECT * FROM {self.dest_db_schema}.{self.warehouse_table} WHERE 1=0 ")
-                            
-                            # Create temp table with same structure
-                            dest_cursor.execute(f"""
-                                CREATE TEMP TABLE {temp_table} AS 
-                                SELECT * FROM {self.dest_db_schema}.{self.warehouse_table} WHERE 1=0
-                            """)
-                            
-                            # Use COPY to insert data efficiently
-                            copy_query = f"COPY {temp_table} ({','.join(column_names)}) FROM STDIN WITH CSV"
-                            
-                            # Convert batch data to CSV format
-                            import io
-                            import csv
-                            
-                            output = io.StringIO()
-                            writer = csv.writer(output)
-                            for row in batch_data:
-                                writer.writerow(row)
-                            output.seek(0)
-                            
-                            logger.info(f" Batch {batch_number} :  copy expert executing...")
-
-                            dest_cursor.copy_expert(copy_query, output)
-                            
-                            # Insert from temp table to main table (handling duplicates)
-                            if mode == 'incremental':
-                                # Assuming 'id' is the primary key
-                                dest_cursor.execute(f"""
-                                    INSERT INTO {self.dest_db_schema}.{self.warehouse_table} 
-                                    SELECT * FROM {temp_table}
-                                    ON CONFLICT (id) DO UPDATE SET
-                                    updated_at = EXCLUDED.updated_at
-                                """)
-                            else:
-                                logger.info(f" Batch {batch_number} :  INSERT INTO {self.dest_db_schema}.{self.warehouse_table} SELECT * FROM {temp_table}")
-                                dest_cursor.execute(f"""
-                                    INSERT INTO {self.dest_db_schema}.{self.warehouse_table} 
-                                    SELECT * FROM {temp_table}
-                                """)
+                            # Clear warehouse table if full transfer
+                            if mode == 'full':
+                                logger.info(f"TRUNCATE TABLE {self.dest_db_schema}.{self.warehouse_table}")
+                                dest_cursor.execute(f"TRUNCATE TABLE {self.dest_db_schema}.{self.warehouse_table}")
                             
+                            self.checkpoints.start(
+                                dest_cursor, f"{self.source_db_schema}.{self.table_name}",
+                                f"{self.dest_db_schema}.{self.warehouse_table}", mode, date_filter, plan
+                            )
                             dest_conn.commit()
-                        
-                        transferred_rows += len(batch_data)
-                        
-                        # Update progress via callback if provided
-                        if progress_callback:
-                            progress_callback(transferred_rows, batch_number)
-                        
-                        batch_time = time.time() - batch_start_time
-                        
-                        logger.info(
-                            f"Batch {batch_number}: {len(batch_data):,} rows "
-                            f"({transferred_rows:,}/{total_rows:,}) "
-                            f"in {batch_time:.2f}s - "
-                            f"{len(batch_data)/batch_time:.0f} rows/sec"
-                        )
-                        
-                        offset += self.batch_size
-                        batch_number += 1
-                        
-                        # Force garbage collection to manage memory
-                        gc.collect()
+                            if mode == 'full':
+                                logger.info("Warehouse table truncated for full transfer")
+                    
+                    if len(ranges) == 1:
+                        range_index, bounds = ranges[0]
+                        self._transfer_range(source_conn, dest_conn, date_filter, total_rows, plan, range_index, bounds, mode, on_batch)
+            
+            if len(ranges) > 1:
+                self._transfer_parallel(date_filter, total_rows, plan, ranges, mode, on_batch)
             
+            transferred_rows = progress['transferred_rows']
             total_time = time.time() - start_time
             avg_speed = transferred_rows / total_time if total_time > 0 else 0
             
@@ -451,12 +1571,296 @@ class PostgreSQLDataTransfer:
             return True
             
         except Exception as e:
+            if self.cancel_token.cancelled:
+                logger.warning("Transfer cancelled; committed batches are checkpointed, rerun with RESUME=true to continue")
+                raise TransferCancelled("Transfer cancelled") from e
             logger.error(f"Transfer failed: {e}")
             return False
+        finally:
+            if profiler:
+                profiler.stop()
+
+    def _resume_plan(self, dest_conn, mode: str, date_filter: Optional[str]):
+        """
+        Rebuild the unfinished ranges of the last run from its checkpoints.
+        Returns (plan, ranges, rows_already_transferred), or None when there is
+        nothing compatible to resume and the run should start from scratch.
+        """
+        rows = self.checkpoints.load(dest_conn, f"{self.source_db_schema}.{self.table_name}", f"{self.dest_db_schema}.{self.warehouse_table}")
+        pending = [row for row in rows if not row['completed']]
+        
+        if not pending:
+            logger.info("No unfinished checkpoint to resume; starting a new transfer")
+            return None
+        if rows[0]['mode'] != mode or rows[0]['date_filter'] != date_filter:
+            logger.warning(
+                f"Checkpoint was written by a '{rows[0]['mode']}' run with filter {rows[0]['date_filter']!r}; "
+                f"not resuming it for a '{mode}' run with filter {date_filter!r}"
+            )
+            return None
+        
+        strategy, key_columns = rows[0]['strategy'], rows[0]['key_columns']
+        ranges = [
+            (row['range_index'], (self.checkpoints.decode(strategy, row['position']), self.checkpoints.decode(strategy, row['range_stop'])))
+            for row in pending
+        ]
+        already_transferred = sum(row['rows_transferred'] for row in rows)
+        logger.info(
+            f"Resuming run {rows[0]['run_id']}: {len(ranges)} unfinished ranges, "
+            f"{already_transferred:,} rows already committed"
+        )
+        return (strategy, key_columns, [bounds for _, bounds in ranges]), ranges, already_transferred
+
+    def _transfer_parallel(self, date_filter: Optional[str], total_rows: int, plan: tuple, ranges: list, mode: str, on_batch):
+        """Run every planned (range_index, bounds) range on its own connection pair in a thread pool"""
+        stop_event = threading.Event()
+        
+        def run_range(range_index, bounds):
+            with self.get_connection(self.source_config) as source_conn:
+                with self.get_connection(self.dest_config) as dest_conn:
+                    self._transfer_range(source_conn, dest_conn, date_filter, total_rows, plan, range_index, bounds, mode, on_batch, stop_event)
+        
+        workers = min(self.parallelism, len(ranges))
+        source_pool, dest_pool = get_connection_pool(self.source_config), get_connection_pool(self.dest_config)
+        if source_pool is dest_pool:
+            source_pool.ensure_max_size(2 * workers)
+        else:
+            source_pool.ensure_max_size(workers)
+            dest_pool.ensure_max_size(workers)
+        
+        logger.info(f"Transferring {len(ranges)} ranges with {workers} workers")
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='transfer-range') as pool:
+            futures = [pool.submit(run_range, range_index, bounds) for range_index, bounds in ranges]
+            try:
+                for future in as_completed(futures):
+                    future.result()
+            except Exception:
+                # Let the remaining workers finish their current batch and stop
+                stop_event.set()
+                raise
+
+    def _transfer_range(self, source_conn, dest_conn, date_filter: Optional[str], total_rows: int, plan: tuple,
+                        range_index: int, bounds: tuple, mode: str, on_batch, stop_event: Optional[threading.Event] = None):
+        """
+        Copy one planned range of the source table batch by batch, committing each
+        batch together with its checkpoint.
+        
+        Batches land in one staging table per connection, created once and emptied
+        by ON COMMIT DELETE ROWS, so the hot loop runs no DDL. A full load with
+        DIRECT_FULL_LOAD enabled skips staging and COPYs straight into the target.
+        """
+        batch_number = 1
+        source_table = f"{self.source_db_schema}.{self.table_name}"
+        target_table = f"{self.dest_db_schema}.{self.warehouse_table}"
+        direct_load = mode == 'full' and self.direct_full_load
+        staging_table = None
+        
+        # Streaming batches never see rows, so read the column list once up front
+        if self.transfer_method == 'stream':
+            column_names = self.get_source_columns(source_conn)
+        
+        try:
+            if not direct_load:
+                staging_table = self._create_staging_table(dest_conn)
+            if mode == 'incremental':
+                upsert_sql = self._build_upsert_sql(dest_conn, staging_table)
+            
+            sizer = self._new_batch_sizer()
+            batches = self._iter_batches(source_conn, date_filter, total_rows, plan, bounds, sizer)
+            if self.pipeline_depth > 0 and self.transfer_method != 'stream':
+                # Fetch and encode the next batches on a producer thread while this one loads
+                batches = prefetch(batches, self.pipeline_depth, self.cancel_token, name=f"prefetch-{self.table_name}-{range_index}")
+            
+            # Process in batches; the clock runs from the end of the previous batch so waiting on a prefetch counts
+            batch_start_time = time.time()
+            try:
+                for query, params, position, batch in batches:
+                    self.cancel_token.raise_if_cancelled()
+                    if stop_event is not None and stop_event.is_set():
+                        logger.info("Stopping range transfer: another worker failed")
+                        return
+                    
+                    logger.info(f" Batch {batch_number} : {query} {params}")
+                    
+                    # Insert batch into warehouse using COPY
+                    with dest_conn.cursor() as dest_cursor:
+                        load_table = target_table if direct_load else staging_table
+                        
+                        if self.transfer_method == 'stream':
+                            # Pipe COPY TO STDOUT on the source straight into COPY FROM STDIN
+                            logger.info(f" Batch {batch_number} :  streaming {self.copy_format} COPY into {load_table}...")
+                            batch_rows = self.stream_copy(source_conn, dest_cursor, query, params, load_table, column_names)
+                            batch_bytes = None  # Streamed batches never sit in memory
+                        else:
+                            column_names, output, batch_rows, batch_bytes = batch
+                            copy_query = f"COPY {load_table} ({','.join(column_names)}) FROM STDIN WITH CSV"
+                            logger.info(f" Batch {batch_number} :  copy expert executing into {load_table}...")
+                            dest_cursor.copy_expert(copy_query, output)
+                            output.close()
+                        
+                        # Insert from staging table to main table (handling duplicates)
+                        if mode == 'incremental':
+                            dest_cursor.execute(upsert_sql)
+                            logger.info(f" Batch {batch_number} :  {dest_cursor.rowcount:,} of {batch_rows:,} rows inserted or changed")
+                        elif not direct_load:
+                            logger.info(f" Batch {batch_number} :  INSERT INTO {target_table} SELECT * FROM {staging_table}")
+                            dest_cursor.execute(f"""
+                                INSERT INTO {target_table} 
+                                SELECT * FROM {staging_table}
+                            """)
+                        
+                        # The checkpoint commits atomically with the batch; committing also empties the staging table
+                        # A batch ending at the range's stop closes it (an open-ended range would otherwise restart from None)
+                        self.checkpoints.advance(dest_cursor, source_table, target_table, range_index, position, batch_rows, position == bounds[1])
+                        dest_conn.commit()
+                    
+                    batch_seconds = time.time() - batch_start_time
+                    on_batch(batch_rows, batch_seconds)
+                    sizer.observe(batch_rows, batch_seconds, batch_bytes)
+                    batch_start_time = time.time()
+                    
+                    batch_number += 1
+            finally:
+                batches.close()
+            
+            if sizer.adaptive:
+                logger.info(f"Range {range_index} finished with batch size {sizer.size:,}{' (settled)' if sizer.settled else ''}")
+            
+            with dest_conn.cursor() as dest_cursor:
+                self.checkpoints.complete(dest_cursor, source_table, target_table, range_index)
+                dest_conn.commit()
+        finally:
+            if staging_table:
+                self._drop_staging_table(dest_conn, staging_table)
+
+    def _new_batch_sizer(self) -> BatchSizer:
+        """
+        Batch sizer for one range. The memory ceiling is shared by the batch being
+        loaded and the ones prefetched behind it.
+        """
+        if not self.adaptive_batch_size:
+            return BatchSizer(self.batch_size)
+        in_flight = 1 + (self.pipeline_depth if self.transfer_method != 'stream' else 0)
+        return BatchSizer(
+            self.batch_size, self.batch_size_min, self.batch_size_max,
+            memory_limit=self.batch_memory_mb * 1024 * 1024 // in_flight, adaptive=True
+        )
+
+    def _create_staging_table(self, dest_conn) -> str:
+        """Create this connection's staging table, shaped like the warehouse table"""
+        staging_table = f"staging_{self.warehouse_table}"
+        logger.info(f"Creating staging table {staging_table}")
+        with dest_conn.cursor() as cursor:
+            # Temp tables skip WAL like UNLOGGED ones and vanish with the session if we never reach the DROP
+            cursor.execute(f"""
+                CREATE TEMP TABLE IF NOT EXISTS {staging_table} ON COMMIT DELETE ROWS AS 
+                SELECT * FROM {self.dest_db_schema}.{self.warehouse_table} WHERE 1=0
+            """)
+        dest_conn.commit()
+        return staging_table
+
+    def _drop_staging_table(self, dest_conn, staging_table: str):
+        """Drop the staging table at the end of a run, tolerating a failed transaction"""
+        try:
+            dest_conn.rollback()
+            with dest_conn.cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {staging_table}")
+            dest_conn.commit()
+        except Exception as e:
+            logger.warning(f"Could not drop staging table {staging_table}: {e}")
+
+    def _get_conflict_key(self, cursor, target_table: str) -> List[str]:
+        """
+        Return the key columns of the warehouse table's primary key, or failing
+        that of its first plain (non-partial, column-only) unique index. INCLUDE
+        columns are not part of the key, and deferrable indexes are skipped
+        since ON CONFLICT cannot use them.
+        """
+        cursor.execute("""
+            SELECT array_agg(a.attname ORDER BY k.ord)
+            FROM pg_index i
+            CROSS JOIN LATERAL unnest(i.indkey) WITH ORDINALITY AS k(attnum, ord)
+            JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+            WHERE i.indrelid = %s::regclass
+              AND i.indisunique AND i.indisvalid AND i.indimmediate AND i.indpred IS NULL AND i.indexprs IS NULL
+              AND k.ord <= i.indnkeyatts
+            GROUP BY i.indexrelid, i.indisprimary
+            ORDER BY i.indisprimary DESC, i.indexrelid
+            LIMIT 1
+        """, (target_table,))
+        row = cursor.fetchone()
+        if not row:
+            raise ValueError(f"Incremental mode needs a primary key or unique index on {target_table} to upsert into")
+        return list(row[0])
+
+    def _build_upsert_sql(self, dest_conn, staging_table: str) -> str:
+        """
+        Build the statement merging the staging table into the warehouse table on
+        its real conflict key, updating every non-key column. Rows whose values
+        have not changed are skipped with IS DISTINCT FROM, so re-reading them
+        writes no new tuple versions. UPSERT_METHOD=merge uses MERGE on PG15+.
+        """
+        target_table = f"{self.dest_db_schema}.{self.warehouse_table}"
+        
+        with dest_conn.cursor() as cursor:
+            key_columns = self._get_conflict_key(cursor, target_table)
+            cursor.execute("""
+                SELECT attname, format_type(atttypid, atttypmod)
+                FROM pg_attribute
+                WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped AND attgenerated = ''
+                ORDER BY attnum
+            """, (target_table,))
+            columns = cursor.fetchall()
+            server_version = dest_conn.server_version
+        
+        # Types without an equality operator are compared by their text form
+        def comparable(alias, name, data_type):
+            column = f"{alias}.{quote_ident(name)}"
+            return f"{column}::text" if data_type in ('json', 'xml', 'point', 'line', 'lseg', 'box', 'path', 'polygon', 'circle') else column
+        
+        column_list = ', '.join(quote_ident(name) for name, _ in columns)
+        updates = [(name, data_type) for name, data_type in columns if name not in key_columns]
+        
+        method = self.upsert_method
+        if method == 'merge' and server_version < 150000:
+            logger.warning(f"MERGE needs PostgreSQL 15+ (destination is {server_version}); using INSERT ... ON CONFLICT")
+            method = 'insert'
+        logger.info(f"Upserting into {target_table} on ({', '.join(key_columns)}) with {'MERGE' if method == 'merge' else 'INSERT ... ON CONFLICT'}")
+        
+        if method == 'merge':
+            match = ' AND '.join(f"t.{quote_ident(col)} = s.{quote_ident(col)}" for col in key_columns)
+            update_clause = ''
+            if updates:
+                update_clause = (
+                    f"WHEN MATCHED AND ({', '.join(comparable('t', n, d) for n, d in updates)}) "
+                    f"IS DISTINCT FROM ({', '.join(comparable('s', n, d) for n, d in updates)}) THEN "
+                    f"UPDATE SET {', '.join(f'{quote_ident(n)} = s.{quote_ident(n)}' for n, _ in updates)} "
+                )
+            return (
+                f"MERGE INTO {target_table} t USING {staging_table} s ON {match} "
+                f"{update_clause}"
+                f"WHEN NOT MATCHED THEN INSERT ({column_list}) "
+                f"VALUES ({', '.join(f's.{quote_ident(n)}' for n, _ in columns)})"
+            )
+        
+        if updates:
+            # ROW() keeps a single-column comparison valid
+            conflict_action = (
+                f"DO UPDATE SET {', '.join(f'{quote_ident(n)} = EXCLUDED.{quote_ident(n)}' for n, _ in updates)} "
+                f"WHERE ROW({', '.join(comparable(target_table, n, d) for n, d in updates)}) "
+                f"IS DISTINCT FROM ROW({', '.join(comparable('EXCLUDED', n, d) for n, d in updates)})"
+            )
+        else:
+            conflict_action = "DO NOTHING"
+        return (
+            f"INSERT INTO {target_table} ({column_list}) SELECT {column_list} FROM {staging_table} "
+            f"ON CONFLICT ({', '.join(quote_ident(col) for col in key_columns)}) {conflict_action}"
+        )
 
     def transfer_pandas_chunks(self, date_filter: Optional[str] = None, progress_callback=None):
         """Alternative method using pandas for complex transformations"""
         start_time = time.time()
+        profiler = None
         
         try:
             # Build query
@@ -470,6 +1874,10 @@ class PostgreSQLDataTransfer:
             transferred_rows = 0
             chunk_number = 1
             
+            profiler = MemoryProfiler() if self.memory_profile else None
+            if profiler:
+                profiler.start()
+            
             # Process in chunks to manage memory
             for chunk in pd.read_sql(query, source_conn_str, chunksize=self.batch_size):
                 chunk_start_time = time.time()
@@ -502,9 +1910,10 @@ class PostgreSQLDataTransfer:
                 
                 chunk_number += 1
                 
-                # Force garbage collection
+                # Release the chunk before pandas reads the next one
                 del chunk
-                gc.collect()
+                if profiler:
+                    profiler.sample(f"Chunk {chunk_number - 1}")
             
             total_time = time.time() - start_time
             avg_speed = transferred_rows / total_time if total_time > 0 else 0
@@ -518,24 +1927,540 @@ class PostgreSQLDataTransfer:
             return True
             
         except Exception as e:
+            if self.cancel_token.cancelled:
+                raise TransferCancelled("Transfer cancelled") from e
             logger.error(f"Pandas transfer failed: {e}")
             return False
+        finally:
+            if profiler:
+                profiler.stop()
 
     def daily_incremental_transfer(self, progress_callback=None):
-        """Transfer only yesterday's data"""
-        yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-        date_filter = f"DATE(created_at) = '{yesterday}'"  # Adjust column name as needed
+        """
+        Transfer the rows changed since the last successful run, tracked by a
+        high watermark on WATERMARK_COLUMN.
+        
+        The filter compares the bare column with constants, so an index on it
+        turns each run into a range scan over just the changed rows. The lower
+        bound is moved back by WATERMARK_OVERLAP_MINUTES to pick up late-arriving
+        rows (the upsert makes re-reading them harmless), and the upper bound is
+        the maximum seen when the run starts, which becomes the next watermark
+        once the run succeeds. Without a stored watermark every row up to that
+        maximum is loaded.
+        """
+        source_table = f"{self.source_db_schema}.{self.table_name}"
+        warehouse_table = f"{self.dest_db_schema}.{self.warehouse_table}"
+        column = quote_ident(self.watermark_column)
+        
+        with self.get_connection(self.dest_config) as dest_conn:
+            self.watermarks.ensure_table(dest_conn)
+            watermark = self.watermarks.get(dest_conn, source_table, warehouse_table, self.watermark_column)
+        
+        with self.get_connection(self.source_config) as source_conn:
+            with source_conn.cursor() as cursor:
+                # max() on an indexed column is a single backward index probe
+                cursor.execute(f"SELECT max({column})::text, pg_typeof(max({column}))::text FROM {source_table}")
+                high, column_type = cursor.fetchone()
+                
+                if high is None:
+                    logger.info(f"{source_table}.{self.watermark_column} has no values; nothing to transfer")
+                    return True
+                
+                conditions = [cursor.mogrify(f"{column} <= %s::{column_type}", (high,)).decode()]
+                if watermark is not None:
+                    lower = cursor.mogrify(f"%s::{column_type}", (watermark,)).decode()
+                    if column_type.startswith(('timestamp', 'date')) and self.watermark_overlap_minutes > 0:
+                        lower = f"({lower} - interval '{self.watermark_overlap_minutes} minutes')::{column_type}"
+                    conditions.insert(0, f"{column} > {lower}")
+        
+        date_filter = ' AND '.join(conditions)
+        if watermark is None:
+            logger.info(f"No watermark stored for {source_table}.{self.watermark_column}; loading every row up to {high}")
+        else:
+            logger.info(f"Starting incremental transfer of {source_table} from watermark {watermark} to {high}")
+        
+        success = self.transfer_batch_copy(date_filter, mode='incremental', progress_callback=progress_callback)
         
-        logger.info(f"Starting daily incremental transfer for {yesterday}")
-        return self.transfer_batch_copy(date_filter, mode='incremental', progress_callback=progress_callback)
+        if success:
+            with self.get_connection(self.dest_config) as dest_conn:
+                self.watermarks.set(dest_conn, source_table, warehouse_table, self.watermark_column, high)
+            logger.info(f"Watermark for {source_table}.{self.watermark_column} advanced to {high}")
+        
+        return success
 
     def full_transfer(self, progress_callback=None):
         """Transfer all data"""
         logger.info("Starting full data transfer")
+        if self.full_load_strategy == 'swap':
+            return self.swap_transfer(progress_callback=progress_callback)
+        return self._in_place_transfer(progress_callback)
+
+    def _in_place_transfer(self, progress_callback=None):
+        """Full reload by truncating the warehouse table, with its indexes deferred if DEFER_INDEXES is set"""
+        if self.defer_indexes:
+            return self._deferred_index_transfer(progress_callback)
         return self.transfer_batch_copy(progress_callback=progress_callback, mode='full')
 
+    def _deferred_index_transfer(self, progress_callback=None):
+        """
+        Full reload in place with the warehouse table's indexes and constraints
+        dropped for the load and rebuilt after it, so rows are not indexed one
+        at a time. They are rebuilt, and checked to be back, even when the load
+        fails or is cancelled, leaving the table as it was found apart from its
+        rows.
+        """
+        target_table = f"{self.dest_db_schema}.{self.warehouse_table}"
+        with self.get_connection(self.dest_config) as dest_conn:
+            with dest_conn.cursor() as cursor:
+                structures = self._get_table_structures(cursor, target_table)
+            dest_conn.commit()
+            try:
+                self._drop_table_structures(dest_conn, target_table, structures)
+            except psycopg2.Error as e:
+                dest_conn.rollback()
+                logger.warning(f"Keeping the indexes of {target_table} during the load: {e}")
+                structures = []
+
+        success = False
+        try:
+            success = self.transfer_batch_copy(progress_callback=progress_callback, mode='full')
+        finally:
+            if structures:
+                # The rebuild is cleanup, so a cancelled job's token must not stop it
+                builder = copy.copy(self)
+                builder.cancel_token = CancellationToken()
+                start_time = time.time()
+                try:
+                    builder._build_table_structures(target_table, structures)
+                    with builder.get_connection(self.dest_config) as dest_conn:
+                        with dest_conn.cursor() as cursor:
+                            rebuilt = {structure['name'] for structure in self._get_table_structures(cursor, target_table)}
+                        dest_conn.commit()
+                    missing = [structure['name'] for structure in structures if structure['name'] not in rebuilt]
+                    if missing:
+                        raise RuntimeError(f"{', '.join(missing)} missing after the rebuild")
+                except Exception as e:
+                    logger.error(f"Rebuilding the indexes of {target_table} failed: {e}; the deferred statements are logged above")
+                    success = False
+                else:
+                    logger.info(f"Rebuilt {len(structures)} indexes and constraints on {target_table} in {time.time() - start_time:.2f}s")
+        return success
+
+    def swap_transfer(self, progress_callback=None):
+        """
+        Full reload that readers never see half done. Rows are loaded into a
+        shadow table shaped like the warehouse table but without its indexes or
+        constraints; those are then built once over the loaded rows, the shadow
+        is analyzed and given the table's owner, storage parameters and grants,
+        and a short transaction renames it into place and drops the old table.
+        With RESUME a failed load continues into the existing shadow table.
+        Tables a swap cannot reproduce (see _swap_blockers) are reloaded in place.
+        """
+        target_table = f"{self.dest_db_schema}.{self.warehouse_table}"
+        shadow_name = f"{self.warehouse_table}_shadow"
+        shadow_table = f"{self.dest_db_schema}.{shadow_name}"
+
+        with self.get_connection(self.dest_config) as dest_conn:
+            with dest_conn.cursor() as cursor:
+                blockers = self._swap_blockers(cursor, target_table)
+            dest_conn.commit()
+        if blockers:
+            logger.warning(f"Reloading {target_table} in place instead of swapping: {'; '.join(blockers)}")
+            return self._in_place_transfer(progress_callback)
+
+        with self.get_connection(self.dest_config) as dest_conn:
+            with dest_conn.cursor() as cursor:
+                cursor.execute("SELECT to_regclass(%s) IS NOT NULL", (shadow_table,))
+                if self.resume and cursor.fetchone()[0]:
+                    logger.info(f"Resuming the load into {shadow_table}")
+                else:
+                    cursor.execute(f"DROP TABLE IF EXISTS {shadow_table}")
+                    cursor.execute(f"""
+                        CREATE TABLE {shadow_table} (LIKE {target_table}
+                            INCLUDING DEFAULTS INCLUDING STORAGE INCLUDING COMMENTS)
+                    """)
+                    # Storage parameters such as fillfactor matter during the load, so they are set before it
+                    cursor.execute("""
+                        SELECT quote_ident(pg_get_userbyid(relowner)), pg_get_userbyid(relowner) <> current_user, reloptions
+                        FROM pg_class WHERE oid = %s::regclass
+                    """, (target_table,))
+                    owner, other_owner, options = cursor.fetchone()
+                    if options:
+                        parameters = [option.split('=', 1) for option in options]
+                        cursor.execute(
+                            f"ALTER TABLE {shadow_table} SET ("
+                            + ", ".join(f"{name} = %s" for name, _ in parameters) + ")",
+                            [value for _, value in parameters]
+                        )
+                    if other_owner:
+                        cursor.execute(f"ALTER TABLE {shadow_table} OWNER TO {owner}")
+                    logger.info(f"Created shadow table {shadow_table}")
+            dest_conn.commit()
+
+        # The load itself is an ordinary full transfer into the shadow table, checkpoints included
+        loader = copy.copy(self)
+        loader.warehouse_table = shadow_name
+        if not loader.transfer_batch_copy(progress_callback=progress_callback, mode='full'):
+            logger.error(f"Load into {shadow_table} failed; {target_table} is unchanged")
+            return False
+
+        try:
+            with self.get_connection(self.dest_config) as dest_conn:
+                with dest_conn.cursor() as cursor:
+                    structures = self._get_table_structures(cursor, target_table)
+                dest_conn.commit()
+                # Built under temporary names and renamed once the original table is gone
+                for structure in structures:
+                    structure['temporary_name'] = f"swap_{uuid.uuid4().hex[:12]}"
+                self._build_table_structures(shadow_table, structures, [structure['temporary_name'] for structure in structures])
+
+                with dest_conn.cursor() as cursor:
+                    cursor.execute(f"ANALYZE {shadow_table}")
+                    cursor.execute("""
+                        SELECT a.privilege_type, a.is_grantable,
+                               CASE WHEN a.grantee = 0 THEN 'PUBLIC' ELSE quote_ident(pg_get_userbyid(a.grantee)) END
+                        FROM pg_class c CROSS JOIN LATERAL aclexplode(c.relacl) a
+                        WHERE c.oid = %s::regclass AND a.grantee <> c.relowner
+                    """, (target_table,))
+                    for privilege, grantable, grantee in cursor.fetchall():
+                        cursor.execute(f"GRANT {privilege} ON {shadow_table} TO {grantee}{' WITH GRANT OPTION' if grantable else ''}")
+                dest_conn.commit()
+
+                self._swap_tables(dest_conn, target_table, shadow_table, structures)
+        except Exception as e:
+            # A resumed run would reuse a half-built shadow and swap in a second set of its indexes
+            self._drop_shadow_table(shadow_table)
+            if isinstance(e, psycopg2.errors.DependentObjectsStillExist):
+                # Only reachable if a dependent object appeared during the load; _swap_blockers catches the rest up front
+                logger.error(f"Cannot replace {target_table}: other objects depend on it ({e}); use FULL_LOAD_STRATEGY=truncate")
+                return False
+            raise
+
+        logger.info(f"Swapped the reloaded {shadow_table} into {target_table}")
+        return True
+
+    def _drop_shadow_table(self, shadow_table: str):
+        """Drop a shadow table after a failed swap, even when the failure was the job being cancelled"""
+        cleaner = copy.copy(self)
+        cleaner.cancel_token = CancellationToken()
+        try:
+            with cleaner.get_connection(self.dest_config) as dest_conn:
+                with dest_conn.cursor() as cursor:
+                    cursor.execute(f"DROP TABLE IF EXISTS {shadow_table}")
+                dest_conn.commit()
+            logger.info(f"Dropped shadow table {shadow_table}")
+        except Exception as e:
+            logger.warning(f"Could not drop shadow table {shadow_table}: {e}")
+
+    def _swap_blockers(self, cursor, target_table: str) -> List[str]:
+        """
+        Reasons target_table cannot be replaced by a shadow table, checked
+        before anything is loaded. Views and foreign keys that reference the
+        table keep it from being dropped (a self-referencing key would point at
+        the old table). Triggers, row level security policies, extended
+        statistics and identity or generated columns are not carried over to
+        the shadow table, and an identity column's sequence would be dropped
+        with the old one. Partitioned tables are not swapped.
+        """
+        cursor.execute("""
+            SELECT c.relkind <> 'r',
+                   (SELECT string_agg(DISTINCT r.ev_class::regclass::text, ', ')
+                    FROM pg_depend d JOIN pg_rewrite r ON r.oid = d.objid
+                    WHERE d.classid = 'pg_rewrite'::regclass AND d.refobjid = c.oid AND r.ev_class <> c.oid),
+                   (SELECT string_agg(conname || ' on ' || conrelid::regclass::text, ', ')
+                    FROM pg_constraint WHERE confrelid = c.oid AND contype = 'f'),
+                   (SELECT string_agg(tgname, ', ') FROM pg_trigger WHERE tgrelid = c.oid AND NOT tgisinternal),
+                   c.relrowsecurity OR EXISTS (SELECT 1 FROM pg_policy WHERE polrelid = c.oid),
+                   (SELECT string_agg(attname, ', ') FROM pg_attribute
+                    WHERE attrelid = c.oid AND attnum > 0 AND NOT attisdropped AND (attidentity <> '' OR attgenerated <> '')),
+                   (SELECT string_agg(stxname, ', ') FROM pg_statistic_ext WHERE stxrelid = c.oid)
+            FROM pg_class c WHERE c.oid = %s::regclass
+        """, (target_table,))
+        not_plain, views, foreign_keys, triggers, row_security, special_columns, statistics = cursor.fetchone()
+        blockers = []
+        if not_plain:
+            blockers.append("it is not a plain table")
+        if views:
+            blockers.append(f"views depend on it ({views})")
+        if foreign_keys:
+            blockers.append(f"foreign keys reference it ({foreign_keys})")
+        if triggers:
+            blockers.append(f"it has triggers ({triggers})")
+        if row_security:
+            blockers.append("it has row level security")
+        if special_columns:
+            blockers.append(f"it has identity or generated columns ({special_columns})")
+        if statistics:
+            blockers.append(f"it has extended statistics ({statistics})")
+        return blockers
+
+    def _swap_tables(self, dest_conn, target_table: str, shadow_table: str, structures: List[Dict[str, Any]]):
+        """
+        Rename shadow_table into target_table's place and drop the old table in
+        one transaction. The ACCESS EXCLUSIVE lock is only held for the renames;
+        if readers keep it from being granted within SWAP_LOCK_TIMEOUT_MS the
+        swap backs off and tries again, so queries do not queue behind it.
+        """
+        old_name = f"{self.warehouse_table}_swapped_out"
+        for attempt in range(1, 6):
+            self.cancel_token.raise_if_cancelled()
+            try:
+                with dest_conn.cursor() as cursor:
+                    cursor.execute(f"SET LOCAL lock_timeout = {int(self.swap_lock_timeout_ms)}")
+                    cursor.execute(f"LOCK TABLE {target_table} IN ACCESS EXCLUSIVE MODE")
+                    # Sequences owned by the old table's columns would be dropped with it
+                    cursor.execute("""
+                        SELECT d.objid::regclass::text, a.attname
+                        FROM pg_depend d
+                        JOIN pg_class s ON s.oid = d.objid AND s.relkind = 'S'
+                        JOIN pg_attribute a ON a.attrelid = d.refobjid AND a.attnum = d.refobjsubid
+                        WHERE d.refobjid = %s::regclass AND d.deptype = 'a'
+                    """, (target_table,))
+                    for sequence, column in cursor.fetchall():
+                        cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {shadow_table}.{quote_ident(column)}")
+
+                    cursor.execute(f"ALTER TABLE {target_table} RENAME TO {old_name}")
+                    cursor.execute(f"ALTER TABLE {shadow_table} RENAME TO {self.warehouse_table}")
+                    cursor.execute(f"DROP TABLE {self.dest_db_schema}.{old_name}")
+                    for structure in structures:
+                        if structure['constraint']:
+                            cursor.execute(
+                                f"ALTER TABLE {target_table} RENAME CONSTRAINT {quote_ident(structure['temporary_name'])} "
+                                f"TO {quote_ident(structure['name'])}"
+                            )
+                        else:
+                            cursor.execute(
+                                f"ALTER INDEX {self.dest_db_schema}.{quote_ident(structure['temporary_name'])} "
+                                f"RENAME TO {quote_ident(structure['name'])}"
+                            )
+                dest_conn.commit()
+                return
+            except psycopg2.errors.LockNotAvailable:
+                dest_conn.rollback()
+                logger.warning(f"Readers kept {target_table} locked (attempt {attempt}/5); retrying the swap")
+                time.sleep(attempt)
+            except Exception:
+                dest_conn.rollback()
+                raise
+        raise RuntimeError(f"Could not lock {target_table} to swap in the reloaded table")
+
+    def _get_table_structures(self, cursor, table: str) -> List[Dict[str, Any]]:
+        """
+        The indexes and the primary key, unique, exclusion, check and foreign
+        key constraints of table, each as {'name', 'constraint', 'contype',
+        'definition', 'unique', 'index'}, in the order they can be built again
+        by _build_table_structures. 'index' is the USING clause of the index
+        behind a primary key or unique constraint, which lets the index be
+        built in parallel with the others and attached to the constraint after;
+        partitioned tables cannot attach one, so theirs is None.
+        """
+        cursor.execute("""
+            SELECT c.conname, c.contype, pg_get_constraintdef(c.oid),
+                   CASE WHEN c.contype IN ('p', 'u') AND NOT c.condeferrable
+                         AND (SELECT relkind FROM pg_class WHERE oid = c.conrelid) <> 'p'
+                        THEN regexp_replace(pg_get_indexdef(c.conindid), '^.*? USING ', '') END
+            FROM pg_constraint c
+            WHERE c.conrelid = %s::regclass AND c.contype IN ('p', 'u', 'x', 'c', 'f')
+            ORDER BY array_position(ARRAY['p', 'u', 'x', 'c', 'f']::"char"[], c.contype), c.conname
+        """, (table,))
+        constraints = [
+            {'name': name, 'constraint': True, 'contype': contype, 'definition': definition, 'unique': contype in ('p', 'u'), 'index': index}
+            for name, contype, definition, index in cursor.fetchall()
+        ]
+        # pg_get_indexdef reads "CREATE [UNIQUE] INDEX name ON table USING method (...)"; keep what follows USING
+        cursor.execute("""
+            SELECT i.relname, x.indisunique, regexp_replace(pg_get_indexdef(x.indexrelid), '^.*? USING ', '')
+            FROM pg_index x
+            JOIN pg_class i ON i.oid = x.indexrelid
+            WHERE x.indrelid = %s::regclass
+              AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid AND c.conrelid = x.indrelid)
+            ORDER BY i.relname
+        """, (table,))
+        indexes = [
+            {'name': name, 'constraint': False, 'contype': None, 'definition': definition, 'unique': unique, 'index': definition}
+            for name, unique, definition in cursor.fetchall()
+        ]
+        return indexes + constraints
+
+    def _drop_table_structures(self, dest_conn, table: str, structures: List[Dict[str, Any]]):
+        """
+        Drop what _get_table_structures recorded, foreign keys first, in one
+        transaction. The statements that rebuild them are logged beforehand so
+        they are not lost if the process dies before _build_table_structures.
+        """
+        for structure in structures:
+            name = quote_ident(structure['name'])
+            if structure['constraint']:
+                statement = f"ALTER TABLE {table} ADD CONSTRAINT {name} {structure['definition']}"
+            else:
+                statement = self._structure_sql(structure, table, structure['name'])
+            logger.info(f"Deferring {structure['name']}: {statement}")
+        with dest_conn.cursor() as cursor:
+            for structure in reversed(structures):
+                if structure['constraint']:
+                    cursor.execute(f"ALTER TABLE {table} DROP CONSTRAINT {quote_ident(structure['name'])}")
+                else:
+                    cursor.execute(f"DROP INDEX {table.rsplit('.', 1)[0]}.{quote_ident(structure['name'])}")
+        dest_conn.commit()
+
+    def _build_table_structures(self, table: str, structures: List[Dict[str, Any]], names: Optional[List[str]] = None):
+        """
+        Build structures from _get_table_structures on table, under names when
+        given. Indexes, including those behind primary keys and unique
+        constraints, are built on up to INDEX_BUILD_WORKERS connections at
+        once, since CREATE INDEX only blocks writes; the constraints are then
+        added one by one, the keys taking over their prebuilt index.
+        """
+        names = names or [structure['name'] for structure in structures]
+        workers = max(1, self.index_build_workers)
+        get_connection_pool(self.dest_config).ensure_max_size(workers + 1)
+
+        def run(statements: List[str], label: str):
+            start_time = time.time()
+            with self.get_connection(self.dest_config) as dest_conn:
+                with dest_conn.cursor() as cursor:
+                    if self.maintenance_work_mem:
+                        cursor.execute("SET LOCAL maintenance_work_mem = %s", (self.maintenance_work_mem,))
+                    for statement in statements:
+                        cursor.execute(statement)
+                dest_conn.commit()
+            logger.info(f"Built {label} on {table} in {time.time() - start_time:.2f}s")
+
+        indexed = [(structure, name) for structure, name in zip(structures, names) if structure['index']]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='index-build') as pool:
+            futures = [
+                pool.submit(
+                    run, [f"CREATE {'UNIQUE ' if structure['unique'] else ''}INDEX {quote_ident(name)} ON {table} USING {structure['index']}"],
+                    name
+                )
+                for structure, name in indexed
+            ]
+            for future in as_completed(futures):
+                future.result()
+
+        constraints = [(structure, name) for structure, name in zip(structures, names) if structure['constraint']]
+        if constraints:
+            run([self._structure_sql(structure, table, name) for structure, name in constraints], f"{len(constraints)} constraints")
+
+    @staticmethod
+    def _structure_sql(structure: Dict[str, Any], table: str, name: str) -> str:
+        """Statement adding one entry of _get_table_structures to table under name, using its prebuilt index if it has one"""
+        if not structure['constraint']:
+            return f"CREATE {'UNIQUE ' if structure['unique'] else ''}INDEX {quote_ident(name)} ON {table} USING {structure['definition']}"
+        if structure['index']:
+            keyword = 'PRIMARY KEY' if structure['contype'] == 'p' else 'UNIQUE'
+            return f"ALTER TABLE {table} ADD CONSTRAINT {quote_ident(name)} {keyword} USING INDEX {quote_ident(name)}"
+        return f"ALTER TABLE {table} ADD CONSTRAINT {quote_ident(name)} {structure['definition']}"
+
+    def repair_transfer(self, date_filter: Optional[str] = None, progress_callback=None):
+        """
+        Bring a drifted warehouse table back in line with the source without a
+        full reload: compare range checksums (see _compare_checksums) and re-copy
+        only the key ranges that differ. Each range is streamed into staging and,
+        in one transaction, warehouse rows gone from the source are deleted and
+        the rest upserted, so unchanged rows are not rewritten. Without a primary
+        key or unique index on the warehouse table the range is deleted and
+        re-inserted instead.
+        """
+        start_time = time.time()
+        source_table = f"{self.source_db_schema}.{self.table_name}"
+        target_table = f"{self.dest_db_schema}.{self.warehouse_table}"
+
+        try:
+            report = self._compare_checksums(date_filter, resolve_rows=False)
+            if report is None:
+                logger.error(f"Repair needs a primary key or NOT NULL unique index on {source_table}")
+                return False
+
+            ranges = report['differing_ranges'] + report['unresolved_ranges']
+            logger.info(
+                f"Compared {report['ranges_checked']:,} key ranges in {time.time() - start_time:.2f}s; "
+                f"{len(ranges):,} to repair"
+            )
+            if not ranges:
+                return True
+
+            key_columns = report['key_columns']
+            repaired_rows = 0
+            with self.get_connection(self.source_config) as source_conn:
+                with self.get_connection(self.dest_config) as dest_conn:
+                    column_names = self.get_source_columns(source_conn)
+                    with dest_conn.cursor() as cursor:
+                        try:
+                            conflict_key = self._get_conflict_key(cursor, target_table)
+                        except ValueError:
+                            logger.warning(f"No primary key or unique index on {target_table}; differing ranges are deleted and re-inserted")
+                            conflict_key = None
+
+                    staging_table = self._create_staging_table(dest_conn)
+                    try:
+                        upsert_sql = self._build_upsert_sql(dest_conn, staging_table) if conflict_key else None
+
+                        for range_number, bounds in enumerate(ranges, 1):
+                            self.cancel_token.raise_if_cancelled()
+                            conditions, params = self._key_range_conditions(key_columns, bounds)
+
+                            with dest_conn.cursor() as dest_cursor:
+                                source_rows = self.stream_copy(
+                                    source_conn, dest_cursor, f"SELECT * FROM {source_table}{self._build_where(date_filter, conditions)}",
+                                    params, staging_table, column_names
+                                )
+
+                                if upsert_sql:
+                                    match = ' AND '.join(f"s.{quote_ident(col)} = t.{quote_ident(col)}" for col in conflict_key)
+                                    vanished = f"NOT EXISTS (SELECT 1 FROM {staging_table} s WHERE {match})"
+                                    dest_cursor.execute(f"DELETE FROM {target_table} t{self._build_where(date_filter, conditions + [vanished])}", params)
+                                    deleted_rows = dest_cursor.rowcount
+                                    dest_cursor.execute(upsert_sql)
+                                else:
+                                    dest_cursor.execute(f"DELETE FROM {target_table}{self._build_where(date_filter, conditions)}", params)
+                                    deleted_rows = dest_cursor.rowcount
+                                    dest_cursor.execute(f"INSERT INTO {target_table} SELECT * FROM {staging_table}")
+                                written_rows = dest_cursor.rowcount
+
+                                # Committing also empties the staging table for the next range
+                                dest_conn.commit()
+
+                            repaired_rows += written_rows + deleted_rows
+                            logger.info(
+                                f"Range {range_number}/{len(ranges)}: {source_rows:,} source rows, "
+                                f"{written_rows:,} inserted or changed, {deleted_rows:,} deleted"
+                            )
+                            if progress_callback:
+                                progress_callback(repaired_rows, range_number)
+                    finally:
+                        self._drop_staging_table(dest_conn, staging_table)
+
+            logger.info(f"Repair completed: {repaired_rows:,} rows written or deleted in {len(ranges):,} ranges in {time.time() - start_time:.2f}s")
+            return True
+
+        except Exception as e:
+            if self.cancel_token.cancelled:
+                logger.warning("Repair cancelled; every range repaired so far is committed")
+                raise TransferCancelled("Transfer cancelled") from e
+            logger.error(f"Repair failed: {e}")
+            return False
+
     def verify_transfer(self, date_filter: Optional[str] = None) -> bool:
-        """Verify the transfer by comparing row counts"""
+        """
+        Verify the transfer by comparing row counts, or with VERIFY_METHOD=checksum
+        by comparing range checksums, which also catches changed values and names
+        the differing keys (see verify_checksums). The checksum report is kept in
+        last_verification. Raises TransferCancelled if the job is cancelled.
+        """
+        self.last_verification = None
+        if self.verify_method == 'checksum':
+            try:
+                report = self.verify_checksums(date_filter)
+            except Exception as e:
+                if self.cancel_token.cancelled:
+                    raise TransferCancelled("Transfer cancelled") from e
+                logger.error(f"Verification failed: {e}")
+                return False
+            if report is not None:
+                self.last_verification = report
+                return report['matched']
+        
         try:
             source_query = f"SELECT COUNT(*) FROM {self.source_db_schema}.{self.table_name}"
             warehouse_query = f"SELECT COUNT(*) FROM {self.dest_db_schema}.{self.warehouse_table}"
@@ -559,16 +2484,238 @@ class PostgreSQLDataTransfer:
             return source_count == warehouse_count
             
         except Exception as e:
+            if self.cancel_token.cancelled:
+                raise TransferCancelled("Transfer cancelled") from e
             logger.error(f"Verification failed: {e}")
             return False
 
+    def verify_checksums(self, date_filter: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Compare the source and warehouse tables on checksums computed by each
+        server, so no rows cross the network (see _compare_checksums), and name
+        the keys missing from the warehouse, extra in it, changed or duplicated.
+        
+        Returns a report dict, or None when the source table has no usable key.
+        """
+        start_time = time.time()
+        report = self._compare_checksums(date_filter, resolve_rows=True)
+        if report is None:
+            return None
+        
+        logger.info(
+            f"Checksum verification - Source: {report['source_rows']:,}, Warehouse: {report['warehouse_rows']:,}, "
+            f"{report['ranges_checked']:,} ranges in {time.time() - start_time:.2f}s: "
+            + ("tables match" if report['matched'] else report['summary'])
+        )
+        for kind in ('missing', 'extra', 'changed', 'duplicated'):
+            if report[kind]:
+                keys = ', '.join(str(key[0] if len(key) == 1 else key) for key in report[kind][:20])
+                logger.warning(f"{kind.capitalize()} keys ({', '.join(report['key_columns'])}): {keys}{' ...' if len(report[kind]) > 20 else ''}")
+        return report
+
+    def _compare_checksums(self, date_filter: Optional[str], resolve_rows: bool) -> Optional[Dict[str, Any]]:
+        """
+        Find the key ranges where the source and warehouse tables differ. The
+        source key is split into VERIFY_RANGES ranges and every range is reduced,
+        on both sides at once, to its row count and the sum of a 64-bit md5 hash
+        of each row. A range that differs is cut into VERIFY_RANGES sub-ranges,
+        all hashed by one grouped scan per side, until the differing ones hold at
+        most VERIFY_LEAF_ROWS rows. Those end up in the report's differing_ranges
+        and, with resolve_rows, are compared row by row.
+        
+        Returns None when the source table has no usable key.
+        """
+        source_table = f"{self.source_db_schema}.{self.table_name}"
+        target_table = f"{self.dest_db_schema}.{self.warehouse_table}"
+        parts = max(2, self.verify_ranges)
+        
+        with self.get_connection(self.source_config) as source_conn:
+            with source_conn.cursor() as cursor:
+                key_columns = self.get_pagination_key(cursor)
+                if not key_columns:
+                    logger.warning(f"No primary key or NOT NULL unique index on {source_table} to compare checksums on")
+                    return None
+                ranges = self._split_key_ranges(cursor, source_table, key_columns, 0, parts)
+            columns = self.get_source_columns(source_conn)
+        
+        row_hash = f"md5(ROW({', '.join(quote_ident(col) for col in columns)})::text)"
+        sides = ((self.source_config, source_table), (self.dest_config, target_table))
+        report = {
+            'matched': True, 'key_columns': key_columns, 'source_rows': 0, 'warehouse_rows': 0, 'ranges_checked': 0,
+            'differing_ranges': [], 'missing': [], 'extra': [], 'changed': [], 'duplicated': [], 'unresolved_ranges': []
+        }
+        
+        workers = max(1, self.verify_workers)
+        for config, _ in sides:
+            get_connection_pool(config).ensure_max_size(workers)
+        
+        def on_both_sides(method, *args):
+            return [pool.submit(method, config, table, key_columns, *args) for config, table in sides]
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='verify') as pool:
+            # Each entry is a range and the keys cutting it into the sub-ranges compared next
+            pending, level = [(bounds, []) for bounds in ranges], 0
+            while pending:
+                self.cancel_token.raise_if_cancelled()
+                futures = [on_both_sides(self._range_checksums, row_hash, date_filter, bounds, boundaries) for bounds, boundaries in pending]
+                
+                differing = []
+                for (bounds, boundaries), (source_future, dest_future) in zip(pending, futures):
+                    edges = [bounds[0]] + boundaries + [bounds[1]]
+                    for i, (source_sum, dest_sum) in enumerate(zip(source_future.result(), dest_future.result())):
+                        report['ranges_checked'] += 1
+                        if level == 0:
+                            report['source_rows'] += source_sum[0]
+                            report['warehouse_rows'] += dest_sum[0]
+                        if source_sum != dest_sum:
+                            differing.append(((edges[i], edges[i + 1]), source_sum[0], dest_sum[0]))
+                
+                if differing:
+                    report['matched'] = False
+                # A table that differs everywhere is not worth narrowing down row by row
+                if len(differing) > 64 * parts:
+                    logger.warning(f"{len(differing):,} key ranges differ; not narrowing them down further")
+                    report['unresolved_ranges'] = [bounds for bounds, _, _ in differing]
+                    break
+                
+                # Split the large ranges on the keys of whichever side has more rows
+                splits = []
+                for bounds, source_count, dest_count in differing:
+                    if max(source_count, dest_count) <= self.verify_leaf_rows:
+                        report['differing_ranges'].append(bounds)
+                    else:
+                        config, table = sides[0] if source_count >= dest_count else sides[1]
+                        splits.append((bounds, pool.submit(
+                            self._range_boundaries, config, table, key_columns, date_filter, bounds, max(source_count, dest_count), parts
+                        )))
+                
+                pending = []
+                for bounds, future in splits:
+                    boundaries = future.result()
+                    if boundaries:
+                        pending.append((bounds, boundaries))
+                    else:
+                        report['differing_ranges'].append(bounds)
+                level += 1
+            
+            if resolve_rows:
+                leaves = [on_both_sides(self._range_row_hashes, row_hash, date_filter, bounds) for bounds in report['differing_ranges']]
+                for source_future, dest_future in leaves:
+                    self._diff_rows(source_future.result(), dest_future.result(), report)
+        
+        for kind in ('missing', 'extra', 'changed', 'duplicated'):
+            # Warehouse keys are not constrained and may hold NULLs
+            report[kind].sort(key=lambda key: tuple((value is None, value) for value in key))
+        report['summary'] = (
+            f"{len(report['missing']):,} rows missing from the warehouse, {len(report['extra']):,} extra, "
+            f"{len(report['changed']):,} changed" +
+            (f", {len(report['duplicated']):,} duplicated" if report['duplicated'] else "") +
+            (f", {len(report['unresolved_ranges']):,} key ranges differing" if report['unresolved_ranges'] else "")
+        ) if resolve_rows else (
+            f"{len(report['differing_ranges']) + len(report['unresolved_ranges']):,} key ranges differing"
+        )
+        return report
+
+    def _key_range_conditions(self, key_columns: List[str], bounds: tuple) -> Tuple[List[str], list]:
+        """WHERE conditions and params selecting the keys in (lower, upper]; None leaves a side open"""
+        key_list = ', '.join(quote_ident(col) for col in key_columns)
+        placeholders = ', '.join(['%s'] * len(key_columns))
+        lower, upper = bounds
+        conditions, params = [], []
+        if lower is not None:
+            conditions.append(f"({key_list}) > ({placeholders})")
+            params.extend(lower)
+        if upper is not None:
+            conditions.append(f"({key_list}) <= ({placeholders})")
+            params.extend(upper)
+        return conditions, params
+
+    def _range_checksums(self, config: dict, table: str, key_columns: List[str], row_hash: str,
+                         date_filter: Optional[str], bounds: tuple, boundaries: list) -> List[Tuple[int, int]]:
+        """
+        Row count and order-independent sum of 64-bit row hashes for each of the
+        len(boundaries) + 1 sub-ranges of bounds, from a single scan of the range
+        """
+        key_list = ', '.join(quote_ident(col) for col in key_columns)
+        placeholders = ', '.join(['%s'] * len(key_columns))
+        conditions, params = self._key_range_conditions(key_columns, bounds)
+        if boundaries:
+            cases = ' '.join(f"WHEN ({key_list}) <= ({placeholders}) THEN {i}" for i in range(len(boundaries)))
+            bucket = f"CASE {cases} ELSE {len(boundaries)} END"
+        else:
+            bucket = "0"
+        
+        with self.get_connection(config) as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(CHECKSUM_SESSION_SETTINGS)
+                cursor.execute(
+                    f"SELECT {bucket} AS bucket, count(*), sum(('x' || left({row_hash}, 16))::bit(64)::bigint) "
+                    f"FROM {table}{self._build_where(date_filter, conditions)} GROUP BY 1",
+                    [value for key in boundaries for value in key] + params
+                )
+                sums = {bucket: (row_count, int(hash_sum)) for bucket, row_count, hash_sum in cursor.fetchall()}
+            conn.rollback()
+        return [sums.get(i, (0, 0)) for i in range(len(boundaries) + 1)]
+
+    def _range_boundaries(self, config: dict, table: str, key_columns: List[str], date_filter: Optional[str],
+                          bounds: tuple, row_count: int, parts: int) -> list:
+        """Keys cutting (lower, upper] into about parts sub-ranges of equal row count, read in one index pass"""
+        key_list = ', '.join(quote_ident(col) for col in key_columns)
+        conditions, params = self._key_range_conditions(key_columns, bounds)
+        step = max(1, -(-row_count // parts))
+        with self.get_connection(config) as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT {key_list} FROM ("
+                    f"SELECT {key_list}, row_number() OVER (ORDER BY {key_list}) AS row_number "
+                    f"FROM {table}{self._build_where(date_filter, conditions)}"
+                    f") keys WHERE row_number %% {step} = 0",
+                    params
+                )
+                boundaries = [tuple(row) for row in cursor.fetchall()]
+            conn.rollback()
+        # The last key may close the range already
+        return [key for key in boundaries if key != bounds[1]]
+
+    def _range_row_hashes(self, config: dict, table: str, key_columns: List[str], row_hash: str,
+                          date_filter: Optional[str], bounds: tuple) -> List[Tuple[tuple, str]]:
+        """(key, row hash) for every row of one key range"""
+        key_list = ', '.join(quote_ident(col) for col in key_columns)
+        conditions, params = self._key_range_conditions(key_columns, bounds)
+        with self.get_connection(config) as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(CHECKSUM_SESSION_SETTINGS)
+                cursor.execute(f"SELECT {key_list}, {row_hash} FROM {table}{self._build_where(date_filter, conditions)}", params)
+                hashes = [(tuple(row[:-1]), row[-1]) for row in cursor]
+            conn.rollback()
+        return hashes
+
+    @staticmethod
+    def _diff_rows(source_rows: List[Tuple[tuple, str]], dest_row_list: List[Tuple[tuple, str]], report: Dict[str, Any]):
+        """
+        Record the keys of one range that are missing from, extra in, or changed in
+        the warehouse, and keys it holds more than once (it may have no unique key)
+        """
+        dest_rows = {}
+        for key, row_hash in dest_row_list:
+            if key in dest_rows:
+                report['duplicated'].append(key)
+            dest_rows[key] = row_hash
+        for key, source_hash in source_rows:
+            if key not in dest_rows:
+                report['missing'].append(key)
+            elif dest_rows[key] != source_hash:
+                report['changed'].append(key)
+        source_keys = {key for key, _ in source_rows}
+        report['extra'].extend(key for key in dest_rows if key not in source_keys)
+
 def main(progress_callback=None):
     """Main execution function"""
     transfer = PostgreSQLDataTransfer()
     transfer.create_warehouse_table_if_not_exists(None)
     
     # Choose transfer mode
-    mode = os.getenv('TRANSFER_MODE', 'daily')  # 'daily', 'full', or 'custom'
+    mode = os.getenv('TRANSFER_MODE', 'daily')  # 'daily', 'full', 'custom' or 'repair'
     
     success = False
     
@@ -580,6 +2727,8 @@ def main(progress_callback=None):
         # Custom date range
         date_filter = "created_at >= '2024-01-01' AND created_at < '2024-02-01'"
         success = transfer.transfer_batch_copy(date_filter, mode='incremental', progress_callback=progress_callback)
+    elif mode == 'repair':
+        success = transfer.repair_transfer(os.getenv('DATE_FILTER') or None, progress_callback=progress_callback)
     
     if success:
         logger.info("Data transfer completed successfully!")
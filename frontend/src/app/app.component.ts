@@ -35,7 +35,8 @@ export class AppComponent implements OnInit, OnDestroy {
   transferModes = [
     { value: 'full', label: 'Full Transfer' },
     { value: 'daily', label: 'Daily Incremental' },
-    { value: 'custom', label: 'Custom Date Range' }
+    { value: 'custom', label: 'Custom Date Range' },
+    { value: 'repair', label: 'Repair Differences' }
   ];
 
   sslModes = [
@@ -57,8 +58,8 @@ export class AppComponent implements OnInit, OnDestroy {
     // Load initial status
     this.loadTransferStatus();
     
-    // Start polling for status updates
-    this.startStatusPolling();
+    // Subscribe to pushed status updates
+    this.startStatusStream();
     
     // Watch for source database changes to auto-load schemas
     this.transferForm.get('sourceDb')?.valueChanges.subscribe(() => {
@@ -198,8 +199,8 @@ export class AppComponent implements OnInit, OnDestroy {
     });
   }
 
-  startStatusPolling() {
-    this.statusSubscription = this.transferService.pollTransferStatus(2000).subscribe({
+  startStatusStream() {
+    this.statusSubscription = this.transferService.streamTransferStatus().subscribe({
       next: (status) => {
         this.transferStatus = status;
         this.isTransferRunning = status.is_running;
@@ -212,7 +213,7 @@ export class AppComponent implements OnInit, OnDestroy {
         }
       },
       error: (error) => {
-        console.error('Error polling transfer status:', error);
+        console.error('Error streaming transfer status:', error);
       }
     });
   }
@@ -327,7 +328,9 @@ export class AppComponent implements OnInit, OnDestroy {
       case 'completed': return 'check_circle';
       case 'failed':
       case 'error': return 'error';
-      case 'stopped': return 'stop_circle';
+      case 'stopping': return 'hourglass_empty';
+      case 'stopped':
+      case 'cancelled': return 'stop_circle';
       default: return 'help_outline';
     }
   }
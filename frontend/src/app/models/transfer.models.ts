@@ -20,10 +20,35 @@ export interface TransferConfig {
   source_db_schema: string;
   dest_db_schema: string;
   batch_size: number;
-  transfer_mode: 'full' | 'daily' | 'custom';
+  adaptive_batch_size?: boolean;
+  batch_size_min?: number;
+  batch_size_max?: number;
+  batch_memory_mb?: number;
+  memory_profile?: boolean;
+  parallelism?: number;
+  pagination_mode?: 'auto' | 'keyset' | 'ctid' | 'offset';
+  direct_full_load?: boolean;
+  full_load_strategy?: 'truncate' | 'swap';
+  swap_lock_timeout_ms?: number;
+  defer_indexes?: boolean;
+  index_build_workers?: number;
+  maintenance_work_mem?: string;
+  transfer_method?: 'batch' | 'stream';
+  stream_buffer_mb?: number;
+  copy_format?: 'text' | 'csv' | 'binary';
+  pipeline_depth?: number;
+  watermark_column?: string;
+  watermark_overlap_minutes?: number;
+  upsert_method?: 'insert' | 'merge';
+  resume?: boolean;
+  transfer_mode: 'full' | 'daily' | 'custom' | 'repair';
   date_filter?: string;
   ssl_mode: string;
   verify_transfer: boolean;
+  verify_method?: 'count' | 'checksum';
+  verify_ranges?: number;
+  verify_workers?: number;
+  verify_leaf_rows?: number;
 }
 
 export interface DataTransferRequest {
@@ -32,6 +57,30 @@ export interface DataTransferRequest {
   transfer_config: TransferConfig;
 }
 
+export interface SchemaTransferConfig extends Omit<TransferConfig, 'table_name' | 'warehouse_table'> {
+  tables?: string[];
+  table_workers?: number;
+  warehouse_prefix?: string;
+}
+
+export interface SchemaTransferRequest {
+  source_db: SourceDatabaseConfig;
+  dest_db: DestinationDatabaseConfig;
+  transfer_config: SchemaTransferConfig;
+}
+
+export interface TableTransferStatus {
+  table_name: string;
+  warehouse_table: string;
+  rows_estimated: number;
+  status: string;
+  transferred_rows: number;
+  current_batch: number;
+  start_time?: string;
+  end_time?: string;
+  error_message?: string;
+}
+
 export interface TransferResponse {
   message: string;
   transfer_id: string;
@@ -39,6 +88,7 @@ export interface TransferResponse {
 }
 
 export interface StatusResponse {
+  transfer_id?: string;
   is_running: boolean;
   current_batch: number;
   total_rows: number;
@@ -46,13 +96,29 @@ export interface StatusResponse {
   progress_percentage: number;
   start_time?: string;
   estimated_completion?: string;
+  rows_per_second?: number;
   status: string;
   error_message?: string;
   logs: string[];
+  tables?: TableTransferStatus[];
+}
+
+export interface JobSummary {
+  transfer_id: string;
+  kind: 'table' | 'schema';
+  source: string;
+  destination: string;
+  status: string;
+  is_running: boolean;
+  progress_percentage: number;
+  created_at: string;
+  start_time?: string;
 }
 
 export interface LogResponse {
   logs: string[];
+  next_seq?: number;
+  truncated?: boolean;
 }
 
 export interface SchemaInfo {
@@ -64,7 +130,9 @@ export interface TableInfo {
   table_name: string;
   table_type: 'table' | 'view';
   row_count?: number;
+  row_count_estimated?: boolean;
   column_count?: number;
+  is_partition?: boolean;
 }
 
 export interface SchemasResponse {
@@ -4,9 +4,11 @@ import { Observable, throwError, timer } from 'rxjs';
 import { catchError, retry, switchMap } from 'rxjs/operators';
 import {
   DataTransferRequest,
+  SchemaTransferRequest,
   TransferResponse,
   StatusResponse,
   LogResponse,
+  JobSummary,
   SourceDatabaseConfig,
   SchemasResponse,
   TablesResponse,
@@ -32,6 +34,16 @@ export class TransferService {
       );
   }
 
+  /**
+   * Start a transfer of several tables or a whole schema
+   */
+  startSchemaTransfer(config: SchemaTransferRequest): Observable<TransferResponse> {
+    return this.http.post<TransferResponse>(`${this.apiUrl}/transfer/schema/start`, config)
+      .pipe(
+        catchError(this.handleError)
+      );
+  }
+
   /**
    * Get transfer status
    */
@@ -53,10 +65,52 @@ export class TransferService {
   }
 
   /**
-   * Get all transfer logs
+   * Get transfer logs
+   * @param since Only return lines from this sequence number on (the previous response's next_seq)
+   */
+  getTransferLogs(since: number = 0): Observable<LogResponse> {
+    return this.http.get<LogResponse>(`${this.apiUrl}/transfer/logs`, { params: { since } })
+      .pipe(
+        catchError(this.handleError)
+      );
+  }
+
+  /**
+   * List running, queued and recently finished transfers
    */
-  getTransferLogs(): Observable<LogResponse> {
-    return this.http.get<LogResponse>(`${this.apiUrl}/transfer/logs`)
+  listTransfers(): Observable<JobSummary[]> {
+    return this.http.get<JobSummary[]>(`${this.apiUrl}/transfers`)
+      .pipe(
+        catchError(this.handleError)
+      );
+  }
+
+  /**
+   * Get the status of one transfer
+   */
+  getJobStatus(transferId: string): Observable<StatusResponse> {
+    return this.http.get<StatusResponse>(`${this.apiUrl}/transfer/${transferId}/status`)
+      .pipe(
+        catchError(this.handleError)
+      );
+  }
+
+  /**
+   * Stop one transfer
+   */
+  stopJob(transferId: string): Observable<{message: string}> {
+    return this.http.post<{message: string}>(`${this.apiUrl}/transfer/${transferId}/stop`, {})
+      .pipe(
+        catchError(this.handleError)
+      );
+  }
+
+  /**
+   * Get the logs of one transfer
+   * @param since Only return lines from this sequence number on (the previous response's next_seq)
+   */
+  getJobLogs(transferId: string, since: number = 0): Observable<LogResponse> {
+    return this.http.get<LogResponse>(`${this.apiUrl}/transfer/${transferId}/logs`, { params: { since } })
       .pipe(
         catchError(this.handleError)
       );
@@ -74,9 +128,10 @@ export class TransferService {
 
   /**
    * Get all tables and views from a specific schema
+   * @param exactCounts Run COUNT(*) per table instead of using catalog estimates
    */
-  getTablesAndViews(sourceDb: SourceDatabaseConfig, schemaName: string): Observable<TablesResponse> {
-    const params = { schema_name: schemaName };
+  getTablesAndViews(sourceDb: SourceDatabaseConfig, schemaName: string, exactCounts: boolean = false): Observable<TablesResponse> {
+    const params = { schema_name: schemaName, exact_counts: exactCounts };
     return this.http.post<TablesResponse>(`${this.apiUrl}/database/tables`, sourceDb, { params })
       .pipe(
         catchError(this.handleError)
@@ -117,6 +172,23 @@ export class TransferService {
     );
   }
 
+  /**
+   * Stream status updates pushed by the API over Server-Sent Events, following
+   * the latest transfer. Updates arrive as progress happens (coalesced by the
+   * API to PROGRESS_EVENT_INTERVAL) instead of on a polling timer.
+   */
+  streamTransferStatus(): Observable<StatusResponse> {
+    return new Observable<StatusResponse>(subscriber => {
+      const source = new EventSource(`${this.apiUrl}/transfer/events`);
+      source.addEventListener('progress', (event: MessageEvent) => {
+        subscriber.next(JSON.parse(event.data) as StatusResponse);
+      });
+      // EventSource reconnects by itself after network errors, so errors are not fatal
+      source.onerror = () => console.warn('Transfer status stream interrupted, reconnecting...');
+      return () => source.close();
+    });
+  }
+
   /**
    * Handle HTTP errors
    */
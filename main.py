@@ -1,14 +1,19 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks, status, Query
+from fastapi import FastAPI, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
+from collections import OrderedDict, deque
 import asyncio
+import hashlib
+import uuid
 import logging
 import os
 import threading
 import time
 from datetime import datetime, timedelta
-from data_transfer import PostgreSQLDataTransfer
+from data_transfer import PostgreSQLDataTransfer, TransferSettings, CancellationToken, TransferCancelled, get_pool_stats
+from transfer_scheduler import MultiTableTransfer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -30,18 +35,214 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global transfer status tracking
-transfer_status = {
-    "is_running": False,
-    "current_batch": 0,
-    "total_rows": 0,
-    "transferred_rows": 0,
-    "start_time": None,
-    "estimated_completion": None,
-    "status": "idle",
-    "error_message": None,
-    "logs": []
-}
+class LogBuffer:
+    """
+    Fixed-capacity ring buffer of a job's log lines. Every line gets the next
+    sequence number, so clients can ask for just the lines after the last one
+    they saw; once full, the oldest lines are dropped.
+    """
+
+    def __init__(self, capacity: int):
+        self._entries: "deque[Tuple[int, str]]" = deque(maxlen=max(1, capacity))
+        self._next_seq = 0
+        self._lock = threading.Lock()
+
+    def append(self, message: str):
+        with self._lock:
+            self._entries.append((self._next_seq, message))
+            self._next_seq += 1
+
+    def since(self, seq: int = 0) -> Tuple[List[str], int, bool]:
+        """Lines with sequence number >= seq, the next sequence number, and whether lines were dropped in between"""
+        with self._lock:
+            first_seq = self._entries[0][0] if self._entries else self._next_seq
+            start = max(seq, first_seq) - first_seq
+            lines = [message for _, message in list(self._entries)[start:]]
+            return lines, self._next_seq, seq < first_seq
+
+    def tail(self, count: int) -> List[str]:
+        with self._lock:
+            return [message for _, message in list(self._entries)[-count:]]
+
+TRANSFER_LOG_CAPACITY = int(os.getenv('TRANSFER_LOG_CAPACITY', '1000'))
+
+def new_transfer_status() -> Dict[str, Any]:
+    """Initial status of a transfer job"""
+    return {
+        "is_running": False,
+        "current_batch": 0,
+        "total_rows": 0,
+        "transferred_rows": 0,
+        "start_time": None,
+        "estimated_completion": None,
+        "rows_per_second": 0,
+        "status": "idle",
+        "error_message": None,
+        "logs": LogBuffer(TRANSFER_LOG_CAPACITY),
+        "tables": []
+    }
+
+class TransferJob:
+    """One transfer run: its request, its status dict, its worker thread and its cancel token"""
+
+    def __init__(self, kind: str, config: BaseModel, targets: frozenset = frozenset()):
+        self.transfer_id = f"transfer_{uuid.uuid4().hex[:12]}"
+        self.kind = kind
+        self.config = config
+        self.targets = targets  # (dest host, dest database, schema, table) of every warehouse table the job loads
+        self.status = new_transfer_status()
+        self.created_at = datetime.now()
+        self.finished_at: Optional[float] = None
+        self.thread: Optional[threading.Thread] = None
+        self.cancel_token = CancellationToken()
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+class JobRegistry:
+    """
+    Thread-safe registry of transfer jobs keyed by transfer_id.
+    
+    At most max_concurrent jobs run at once; the rest wait in the 'queued'
+    status. Finished jobs are evicted retention_seconds after they end.
+    """
+
+    def __init__(self, max_concurrent: int, retention_seconds: float):
+        self.max_concurrent = max(1, max_concurrent)
+        self.retention_seconds = retention_seconds
+        self._jobs: "OrderedDict[str, TransferJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_concurrent)
+
+    def submit(self, kind: str, config: BaseModel, target, targets: frozenset = frozenset()) -> TransferJob:
+        """Register a job loading the warehouse tables in targets and start target(job) in a thread once a slot is free"""
+        job = TransferJob(kind, config, targets)
+        job.status["status"] = "queued"
+        job.status["logs"].append(f"{datetime.now().isoformat()}: Queued as {job.transfer_id}")
+        
+        def run():
+            with self._slots:
+                try:
+                    target(job)
+                finally:
+                    job.finished_at = time.monotonic()
+        
+        job.thread = threading.Thread(target=run, name=job.transfer_id, daemon=True)
+        with self._lock:
+            self._evict()
+            self._jobs[job.transfer_id] = job
+        job.thread.start()
+        return job
+
+    def get(self, transfer_id: str) -> Optional[TransferJob]:
+        with self._lock:
+            self._evict()
+            return self._jobs.get(transfer_id)
+
+    def list(self) -> List[TransferJob]:
+        with self._lock:
+            self._evict()
+            return list(self._jobs.values())
+
+    def latest(self) -> Optional[TransferJob]:
+        with self._lock:
+            return next(reversed(self._jobs.values()), None)
+
+    def find_active(self, predicate) -> Optional[TransferJob]:
+        """First unfinished job whose config matches predicate"""
+        with self._lock:
+            return next((job for job in self._jobs.values() if not job.finished and predicate(job)), None)
+
+    def _evict(self):
+        cutoff = time.monotonic() - self.retention_seconds
+        for transfer_id in [tid for tid, job in self._jobs.items() if job.finished and job.finished_at < cutoff]:
+            del self._jobs[transfer_id]
+
+# Progress events are coalesced to at most one per interval per subscriber
+PROGRESS_EVENT_INTERVAL = float(os.getenv('PROGRESS_EVENT_INTERVAL', '0.5'))
+PROGRESS_HEARTBEAT_SECONDS = 15
+
+job_registry = JobRegistry(
+    max_concurrent=int(os.getenv('MAX_CONCURRENT_TRANSFERS', '4')),
+    retention_seconds=float(os.getenv('JOB_RETENTION_SECONDS', '3600'))
+)
+
+class MetadataCache:
+    """
+    Thread-safe LRU cache with a TTL for source catalog lookups.
+    
+    Keys are (connection fingerprint, kind, schema, table, ...) tuples so entries
+    can be invalidated per database, schema or table.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Tuple, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, fingerprint: Optional[str] = None, schema_name: Optional[str] = None, table_name: Optional[str] = None) -> int:
+        """
+        Drop entries matching every given field. Schema-wide entries (the schema
+        list and the schema's table list) are dropped along with a table's own
+        entries because they report its row count. Returns the number removed.
+        """
+        with self._lock:
+            doomed = []
+            for key in self._entries:
+                key_fingerprint, _, key_schema, key_table = key[:4]
+                if fingerprint is not None and key_fingerprint != fingerprint:
+                    continue
+                if schema_name is not None and key_schema not in (None, schema_name):
+                    continue
+                if table_name is not None and key_table not in (None, table_name):
+                    continue
+                doomed.append(key)
+            for key in doomed:
+                del self._entries[key]
+            return len(doomed)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+metadata_cache = MetadataCache(
+    ttl_seconds=float(os.getenv('METADATA_CACHE_TTL', '300')),
+    max_entries=int(os.getenv('METADATA_CACHE_MAX_ENTRIES', '1024'))
+)
+
+def connection_fingerprint(db_config: BaseModel) -> str:
+    """Stable identifier for a database connection, without keeping the password in the key"""
+    raw = f"{db_config.host}:{db_config.port}/{db_config.database}/{db_config.user}/{db_config.password}"
+    return hashlib.sha256(raw.encode()).hexdigest()
 
 class SourceDatabaseConfig(BaseModel):
     host: str = Field(..., description="Source database host")
@@ -63,22 +264,60 @@ class TransferConfig(BaseModel):
     source_db_schema: str = Field("public", description="Source database schema")
     dest_db_schema: str = Field("my", description="Destination database schema")
     batch_size: int = Field(10000, description="Batch size for transfer")
-    transfer_mode: str = Field("full", description="Transfer mode: full, daily, or custom")
+    adaptive_batch_size: bool = Field(False, description="Tune the batch size per range from measured throughput, starting at batch_size")
+    batch_size_min: int = Field(1000, description="Smallest batch an adaptive run may use")
+    batch_size_max: int = Field(500000, description="Largest batch an adaptive run may use")
+    batch_memory_mb: int = Field(256, description="Memory ceiling for the batches an adaptive run holds at once (MB)")
+    memory_profile: bool = Field(False, description="Log tracemalloc memory figures after every batch and a summary at the end")
+    parallelism: int = Field(1, description="Number of key/ctid ranges transferred concurrently")
+    pagination_mode: str = Field("auto", description="Batch paging: auto, keyset, ctid, or offset")
+    direct_full_load: bool = Field(True, description="In full mode, COPY straight into the warehouse table instead of staging")
+    full_load_strategy: str = Field("truncate", description="Reload the warehouse table in place (truncate) or in a shadow table swapped in at the end (swap)")
+    swap_lock_timeout_ms: int = Field(5000, ge=1, description="Longest wait for the warehouse table lock before a swap is retried")
+    defer_indexes: bool = Field(False, description="Drop the warehouse table's indexes and constraints for full loads and rebuild them after")
+    index_build_workers: int = Field(2, ge=1, le=16, description="Indexes built at once after a full load")
+    maintenance_work_mem: str = Field("", description="maintenance_work_mem for index builds, e.g. 1GB; empty keeps the server default")
+    transfer_method: str = Field("batch", description="Batch load method: batch (fetch + CSV) or stream (COPY to COPY)")
+    stream_buffer_mb: int = Field(16, description="Buffer between source and destination COPY in stream mode (MB)")
+    copy_format: str = Field("text", description="COPY format for stream mode: text, csv, or binary")
+    pipeline_depth: int = Field(0, description="Batches fetched from the source ahead of the destination load in batch mode (0 = off)")
+    watermark_column: str = Field("updated_at", description="Column whose high watermark drives daily incremental runs")
+    watermark_overlap_minutes: int = Field(10, description="Minutes re-read below the watermark to catch late-arriving rows")
+    upsert_method: str = Field("insert", description="Incremental upsert statement: insert (ON CONFLICT) or merge (PG15+)")
+    resume: bool = Field(False, description="Resume the last failed run of this table from its checkpoints")
+    transfer_mode: str = Field("full", description="Transfer mode: full, daily, custom, or repair")
     date_filter: Optional[str] = Field(None, description="Custom date filter for data")
     ssl_mode: str = Field("require", description="SSL mode for connections")
     verify_transfer: bool = Field(True, description="Verify transfer after completion")
+    verify_method: str = Field("count", description="Verification: count (row counts) or checksum (per key range, names differing rows)")
+    verify_ranges: int = Field(16, description="Key ranges per checksum pass, and sub-ranges each differing range is cut into")
+    verify_workers: int = Field(4, description="Checksum queries run at once across both databases")
+    verify_leaf_rows: int = Field(1000, description="Differing ranges with at most this many rows are compared row by row")
 
 class DataTransferRequest(BaseModel):
     source_db: SourceDatabaseConfig
     dest_db: DestinationDatabaseConfig
     transfer_config: TransferConfig
 
+class SchemaTransferConfig(TransferConfig):
+    table_name: str = Field("", description="Unused; tables come from 'tables' or the source schema")
+    warehouse_table: str = Field("", description="Unused; each table keeps its name, plus warehouse_prefix")
+    tables: Optional[List[str]] = Field(None, description="Tables to transfer; every table of source_db_schema when omitted")
+    table_workers: int = Field(4, description="Tables transferred concurrently")
+    warehouse_prefix: str = Field("", description="Prefix added to each warehouse table name")
+
+class SchemaTransferRequest(BaseModel):
+    source_db: SourceDatabaseConfig
+    dest_db: DestinationDatabaseConfig
+    transfer_config: SchemaTransferConfig
+
 class TransferResponse(BaseModel):
     message: str
     transfer_id: str
     status: str
 
 class StatusResponse(BaseModel):
+    transfer_id: Optional[str] = None
     is_running: bool
     current_batch: int
     total_rows: int
@@ -86,9 +325,22 @@ class StatusResponse(BaseModel):
     progress_percentage: float
     start_time: Optional[str]
     estimated_completion: Optional[str]
+    rows_per_second: int = 0
     status: str
     error_message: Optional[str]
     logs: list
+    tables: list = []
+
+class JobSummary(BaseModel):
+    transfer_id: str
+    kind: str  # 'table' or 'schema'
+    source: str
+    destination: str
+    status: str
+    is_running: bool
+    progress_percentage: float
+    created_at: str
+    start_time: Optional[str]
 
 class SchemaInfo(BaseModel):
     schema_name: str
@@ -98,43 +350,92 @@ class TableInfo(BaseModel):
     table_name: str
     table_type: str  # 'table' or 'view'
     row_count: Optional[int] = None
+    row_count_estimated: bool = False
+    is_partition: bool = False
 
 class DatabaseInfoResponse(BaseModel):
     schemas: List[SchemaInfo]
     tables: List[TableInfo]
 
-def set_environment_variables(config: DataTransferRequest):
-    """Set environment variables from the request configuration"""
-    # Source database
-    os.environ['SOURCE_HOST'] = config.source_db.host
-    os.environ['SOURCE_PORT'] = str(config.source_db.port)
-    os.environ['SOURCE_DB'] = config.source_db.database
-    os.environ['SOURCE_USER'] = config.source_db.user
-    os.environ['SOURCE_PASSWORD'] = config.source_db.password
-    
-    # Destination database
-    os.environ['DEST_HOST'] = config.dest_db.host
-    os.environ['DEST_PORT'] = str(config.dest_db.port)
-    os.environ['DEST_DB'] = config.dest_db.database
-    os.environ['DEST_USER'] = config.dest_db.user
-    os.environ['DEST_PASSWORD'] = config.dest_db.password
-    
-    # Transfer configuration
-    os.environ['TABLE_NAME'] = config.transfer_config.table_name
-    os.environ['WAREHOUSE_TABLE'] = config.transfer_config.warehouse_table
-    os.environ['SOURCE_DB_SCHEMA'] = config.transfer_config.source_db_schema
-    os.environ['DEST_DB_SCHEMA'] = config.transfer_config.dest_db_schema
-    os.environ['BATCH_SIZE'] = str(config.transfer_config.batch_size)
-    os.environ['TRANSFER_MODE'] = config.transfer_config.transfer_mode
-    os.environ['SSL_MODE'] = config.transfer_config.ssl_mode
-    os.environ['VERIFY_TRANSFER'] = str(config.transfer_config.verify_transfer).lower()
-    
-    if config.transfer_config.date_filter:
-        os.environ['DATE_FILTER'] = config.transfer_config.date_filter
+def source_settings(source_db: SourceDatabaseConfig) -> Dict[str, Any]:
+    """Connection settings for the source database, keyed like the environment variables"""
+    return {
+        'SOURCE_HOST': source_db.host,
+        'SOURCE_PORT': source_db.port,
+        'SOURCE_DB': source_db.database,
+        'SOURCE_USER': source_db.user,
+        'SOURCE_PASSWORD': source_db.password,
+    }
+
+def build_transfer_settings(config: DataTransferRequest) -> TransferSettings:
+    """Explicit settings for one transfer request; nothing is written to os.environ"""
+    transfer_config = config.transfer_config
+    return TransferSettings({
+        # Source database
+        **source_settings(config.source_db),
+        
+        # Destination database
+        'DEST_HOST': config.dest_db.host,
+        'DEST_PORT': config.dest_db.port,
+        'DEST_DB': config.dest_db.database,
+        'DEST_USER': config.dest_db.user,
+        'DEST_PASSWORD': config.dest_db.password,
+        
+        # Transfer configuration
+        'TABLE_NAME': transfer_config.table_name,
+        'WAREHOUSE_TABLE': transfer_config.warehouse_table,
+        'SOURCE_DB_SCHEMA': transfer_config.source_db_schema,
+        'DEST_DB_SCHEMA': transfer_config.dest_db_schema,
+        'BATCH_SIZE': transfer_config.batch_size,
+        'ADAPTIVE_BATCH_SIZE': transfer_config.adaptive_batch_size,
+        'BATCH_SIZE_MIN': transfer_config.batch_size_min,
+        'BATCH_SIZE_MAX': transfer_config.batch_size_max,
+        'BATCH_MEMORY_MB': transfer_config.batch_memory_mb,
+        'MEMORY_PROFILE': transfer_config.memory_profile,
+        'PARALLELISM': transfer_config.parallelism,
+        'PAGINATION_MODE': transfer_config.pagination_mode,
+        'TRANSFER_METHOD': transfer_config.transfer_method,
+        'DIRECT_FULL_LOAD': transfer_config.direct_full_load,
+        'FULL_LOAD_STRATEGY': transfer_config.full_load_strategy,
+        'SWAP_LOCK_TIMEOUT_MS': transfer_config.swap_lock_timeout_ms,
+        'DEFER_INDEXES': transfer_config.defer_indexes,
+        'INDEX_BUILD_WORKERS': transfer_config.index_build_workers,
+        'MAINTENANCE_WORK_MEM': transfer_config.maintenance_work_mem,
+        'STREAM_BUFFER_MB': transfer_config.stream_buffer_mb,
+        'COPY_FORMAT': transfer_config.copy_format,
+        'PIPELINE_DEPTH': transfer_config.pipeline_depth,
+        'WATERMARK_COLUMN': transfer_config.watermark_column,
+        'WATERMARK_OVERLAP_MINUTES': transfer_config.watermark_overlap_minutes,
+        'UPSERT_METHOD': transfer_config.upsert_method,
+        'RESUME': transfer_config.resume,
+        'TRANSFER_MODE': transfer_config.transfer_mode,
+        'SSL_MODE': transfer_config.ssl_mode,
+        'VERIFY_TRANSFER': transfer_config.verify_transfer,
+        'VERIFY_METHOD': transfer_config.verify_method,
+        'VERIFY_RANGES': transfer_config.verify_ranges,
+        'VERIFY_WORKERS': transfer_config.verify_workers,
+        'VERIFY_LEAF_ROWS': transfer_config.verify_leaf_rows,
+        'DATE_FILTER': transfer_config.date_filter,
+    })
 
-def run_data_transfer(config: DataTransferRequest):
-    """Run the data transfer in a separate thread"""
-    global transfer_status
+def update_throughput(transfer_status: Dict[str, Any]):
+    """Refresh rows/sec and the estimated completion time from the job's progress so far"""
+    transferred_count, total_rows = transfer_status["transferred_rows"], transfer_status["total_rows"]
+    if transferred_count > 0 and transfer_status["start_time"]:
+        elapsed_time = (datetime.now() - datetime.fromisoformat(transfer_status["start_time"])).total_seconds()
+        if elapsed_time > 0:
+            rows_per_second = transferred_count / elapsed_time
+            transfer_status["rows_per_second"] = round(rows_per_second)
+            remaining_rows = max(total_rows - transferred_count, 0)
+            if rows_per_second > 0:
+                remaining_seconds = remaining_rows / rows_per_second
+                estimated_completion = datetime.now() + timedelta(seconds=remaining_seconds)
+                transfer_status["estimated_completion"] = estimated_completion.isoformat()
+
+def run_data_transfer(job: TransferJob):
+    """Run a single-table transfer job in its worker thread"""
+    config = job.config
+    transfer_status = job.status
     
     try:
         transfer_status.update({
@@ -142,15 +443,11 @@ def run_data_transfer(config: DataTransferRequest):
             "status": "initializing",
             "start_time": datetime.now().isoformat(),
             "error_message": None,
-            "logs": [],
             "transferred_rows": 0  # Reset transferred rows
         })
         
-        # Set environment variables
-        set_environment_variables(config)
-        
         # Create transfer instance
-        transfer = PostgreSQLDataTransfer()
+        transfer = PostgreSQLDataTransfer(build_transfer_settings(config), job.cancel_token)
         
         # Create warehouse table if needed
         transfer_status["status"] = "creating_tables"
@@ -174,7 +471,6 @@ def run_data_transfer(config: DataTransferRequest):
         
         # Define a callback function to update progress
         def update_progress(transferred_count: int, batch_number: int):
-            global transfer_status
             transfer_status["transferred_rows"] = transferred_count
             transfer_status["current_batch"] = batch_number
             logger.info(f" progress {transferred_count} :   ...")
@@ -182,16 +478,7 @@ def run_data_transfer(config: DataTransferRequest):
             progress_percentage = (transferred_count / total_rows * 100) if total_rows > 0 else 0
             transfer_status["logs"].append(f"{datetime.now().isoformat()}: Progress - {transferred_count:,}/{total_rows:,} rows ({progress_percentage:.1f}%) - Batch {batch_number}")
             logger.info(f" progress percentage{progress_percentage} : ...")
-            # Calculate estimated completion time
-            if transferred_count > 0 and transfer_status["start_time"]:
-                elapsed_time = (datetime.now() - datetime.fromisoformat(transfer_status["start_time"])).total_seconds()
-                if elapsed_time > 0:
-                    rows_per_second = transferred_count / elapsed_time
-                    remaining_rows = total_rows - transferred_count
-                    if rows_per_second > 0:
-                        remaining_seconds = remaining_rows / rows_per_second
-                        estimated_completion = datetime.now() + timedelta(seconds=remaining_seconds)
-                        transfer_status["estimated_completion"] = estimated_completion.isoformat()
+            update_throughput(transfer_status)
         
         if mode == 'daily':
             success = transfer.daily_incremental_transfer(progress_callback=update_progress)
@@ -199,6 +486,8 @@ def run_data_transfer(config: DataTransferRequest):
             success = transfer.full_transfer(progress_callback=update_progress)
         elif mode == 'custom':
             success = transfer.transfer_batch_copy(date_filter, mode='incremental', progress_callback=update_progress)
+        elif mode == 'repair':
+            success = transfer.repair_transfer(date_filter, progress_callback=update_progress)
         
         if success:
             transfer_status["status"] = "verifying" if config.transfer_config.verify_transfer else "completed"
@@ -213,11 +502,16 @@ def run_data_transfer(config: DataTransferRequest):
                 else:
                     transfer_status["status"] = "verification_failed"
                     transfer_status["logs"].append(f"{datetime.now().isoformat()}: Verification failed!")
+                    if transfer.last_verification:
+                        transfer_status["logs"].append(f"{datetime.now().isoformat()}: {transfer.last_verification['summary']}")
         else:
             transfer_status["status"] = "failed"
             transfer_status["error_message"] = "Data transfer failed"
             transfer_status["logs"].append(f"{datetime.now().isoformat()}: Transfer failed!")
             
+    except TransferCancelled:
+        transfer_status["status"] = "cancelled"
+        transfer_status["logs"].append(f"{datetime.now().isoformat()}: Transfer cancelled; committed batches are kept and can be resumed")
     except Exception as e:
         transfer_status["status"] = "error"
         transfer_status["error_message"] = str(e)
@@ -225,50 +519,85 @@ def run_data_transfer(config: DataTransferRequest):
         logger.error(f"Transfer error: {e}")
     finally:
         transfer_status["is_running"] = False
+        # The warehouse table's contents and shape may have changed
+        metadata_cache.invalidate(
+            connection_fingerprint(config.dest_db),
+            config.transfer_config.dest_db_schema,
+            config.transfer_config.warehouse_table
+        )
 
-@app.get("/")
-async def root():
-    return {"message": "PostgreSQL Data Transfer API"}
-
-@app.post("/transfer/start", response_model=TransferResponse)
-async def start_transfer(config: DataTransferRequest, background_tasks: BackgroundTasks):
-    """Start a data transfer job"""
-    global transfer_status
+def run_schema_transfer(job: TransferJob):
+    """Run a multi-table transfer job in its worker thread"""
+    config = job.config
+    transfer_status = job.status
+    transfer_config = config.transfer_config
     
-    if transfer_status["is_running"]:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Transfer already in progress"
+    try:
+        transfer_status.update({
+            "is_running": True,
+            "status": "initializing",
+            "start_time": datetime.now().isoformat(),
+            "error_message": None,
+            "transferred_rows": 0,
+            "tables": []
+        })
+        
+        def update_progress(tables: List[Dict[str, Any]]):
+            transfer_status["tables"] = tables
+            transfer_status["total_rows"] = sum(t["rows_estimated"] for t in tables)
+            transfer_status["transferred_rows"] = sum(t["transferred_rows"] for t in tables)
+            transfer_status["current_batch"] = sum(t["current_batch"] for t in tables)
+            update_throughput(transfer_status)
+        
+        scheduler = MultiTableTransfer(
+            schema_name=transfer_config.source_db_schema,
+            tables=transfer_config.tables,
+            max_workers=transfer_config.table_workers,
+            mode=transfer_config.transfer_mode,
+            date_filter=transfer_config.date_filter,
+            warehouse_prefix=transfer_config.warehouse_prefix,
+            verify=transfer_config.verify_transfer,
+            settings=build_transfer_settings(config),
+            cancel_token=job.cancel_token,
+            progress_callback=update_progress
         )
+        
+        transfer_status["status"] = "transferring"
+        transfer_status["logs"].append(f"{datetime.now().isoformat()}: Starting multi-table transfer of schema {transfer_config.source_db_schema}...")
+        
+        success = scheduler.run()
+        update_progress(scheduler.status())
+        
+        for table in transfer_status["tables"]:
+            transfer_status["logs"].append(f"{datetime.now().isoformat()}: {table['table_name']}: {table['status']} ({table['transferred_rows']:,} rows)")
+        
+        if success:
+            transfer_status["status"] = "completed"
+            transfer_status["logs"].append(f"{datetime.now().isoformat()}: All tables transferred successfully!")
+        else:
+            transfer_status["status"] = "failed"
+            transfer_status["error_message"] = "One or more tables failed"
+            transfer_status["logs"].append(f"{datetime.now().isoformat()}: Multi-table transfer finished with failures!")
     
-    # Reset status
-    transfer_status = {
-        "is_running": False,
-        "current_batch": 0,
-        "total_rows": 0,
-        "transferred_rows": 0,
-        "start_time": None,
-        "estimated_completion": None,
-        "status": "idle",
-        "error_message": None,
-        "logs": []
-    }
-    
-    # Start transfer in background
-    transfer_thread = threading.Thread(target=run_data_transfer, args=(config,))
-    transfer_thread.daemon = True
-    transfer_thread.start()
-    
-    return TransferResponse(
-        message="Data transfer started successfully",
-        transfer_id=f"transfer_{int(time.time())}",
-        status="started"
-    )
+    except TransferCancelled:
+        transfer_status["status"] = "cancelled"
+        transfer_status["logs"].append(f"{datetime.now().isoformat()}: Transfer cancelled; committed batches are kept and can be resumed")
+    except Exception as e:
+        transfer_status["status"] = "error"
+        transfer_status["error_message"] = str(e)
+        transfer_status["logs"].append(f"{datetime.now().isoformat()}: Error: {str(e)}")
+        logger.error(f"Multi-table transfer error: {e}")
+    finally:
+        transfer_status["is_running"] = False
+        metadata_cache.invalidate(connection_fingerprint(config.dest_db), transfer_config.dest_db_schema)
 
-@app.get("/transfer/status", response_model=StatusResponse)
-async def get_transfer_status():
-    """Get current transfer status"""
-    global transfer_status
+@app.get("/")
+async def root():
+    return {"message": "PostgreSQL Data Transfer API"}
+
+def build_status_response(job: Optional[TransferJob]) -> StatusResponse:
+    """StatusResponse for a job, or an idle status when there is none"""
+    transfer_status = job.status if job else new_transfer_status()
     
     progress_percentage = 0
     if transfer_status["total_rows"] > 0 and transfer_status["transferred_rows"] >= 0:
@@ -277,6 +606,7 @@ async def get_transfer_status():
         progress_percentage = min(progress_percentage, 100.0)
     
     return StatusResponse(
+        transfer_id=job.transfer_id if job else None,
         is_running=transfer_status["is_running"],
         current_batch=transfer_status["current_batch"],
         total_rows=transfer_status["total_rows"],
@@ -284,56 +614,239 @@ async def get_transfer_status():
         progress_percentage=round(progress_percentage, 2),
         start_time=transfer_status["start_time"],
         estimated_completion=transfer_status["estimated_completion"],
+        rows_per_second=transfer_status["rows_per_second"],
         status=transfer_status["status"],
         error_message=transfer_status["error_message"],
-        logs=transfer_status["logs"][-10:]  # Return last 10 log entries
+        logs=transfer_status["logs"].tail(10),  # Return last 10 log entries
+        tables=transfer_status["tables"]
     )
 
+def get_job_or_404(transfer_id: str) -> TransferJob:
+    job = job_registry.get(transfer_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Transfer {transfer_id} not found"
+        )
+    return job
+
+def stop_job(job: TransferJob):
+    if job.finished:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Transfer {job.transfer_id} is not running"
+        )
+    
+    # The worker notices between batches, and in-flight statements are cancelled
+    # on the server; the job ends as 'cancelled' once its threads have unwound
+    job.status["status"] = "stopping"
+    job.status["logs"].append(f"{datetime.now().isoformat()}: Transfer stop requested by user")
+    job.cancel_token.cancel()
+
+def raise_if_targets_busy(targets: frozenset):
+    """409 if an unfinished job, single-table or schema, loads any of the warehouse tables in targets"""
+    active = job_registry.find_active(lambda job: job.targets & targets)
+    if active:
+        busy = sorted(f"{schema}.{table}" for _, _, schema, table in active.targets & targets)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Transfer {active.transfer_id} is already loading {', '.join(busy)}"
+        )
+
+@app.post("/transfer/start", response_model=TransferResponse)
+async def start_transfer(config: DataTransferRequest):
+    """Start a data transfer job; up to MAX_CONCURRENT_TRANSFERS run at once and the rest queue"""
+    targets = frozenset([(config.dest_db.host, config.dest_db.database, config.transfer_config.dest_db_schema, config.transfer_config.warehouse_table)])
+    raise_if_targets_busy(targets)
+    
+    job = job_registry.submit('table', config, run_data_transfer, targets)
+    
+    return TransferResponse(
+        message="Data transfer started successfully",
+        transfer_id=job.transfer_id,
+        status=job.status["status"]
+    )
+
+@app.post("/transfer/schema/start", response_model=TransferResponse)
+def start_schema_transfer(config: SchemaTransferRequest):
+    """
+    Start a transfer of several tables, or of a whole schema, with per-table status.
+    The tables are resolved against the source catalog first, so none of them
+    can be one another job is already loading. A plain def runs in FastAPI's
+    threadpool, off the event loop, while the catalog is read.
+    """
+    transfer_config = config.transfer_config
+    try:
+        planned = MultiTableTransfer(
+            schema_name=transfer_config.source_db_schema,
+            tables=transfer_config.tables,
+            settings=build_transfer_settings(config)
+        ).plan()
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    targets = frozenset(
+        (config.dest_db.host, config.dest_db.database, transfer_config.dest_db_schema, f"{transfer_config.warehouse_prefix}{t['table_name']}")
+        for t in planned
+    )
+    raise_if_targets_busy(targets)
+    
+    job = job_registry.submit('schema', config, run_schema_transfer, targets)
+    
+    return TransferResponse(
+        message="Multi-table transfer started successfully",
+        transfer_id=job.transfer_id,
+        status=job.status["status"]
+    )
+
+@app.get("/transfers", response_model=List[JobSummary])
+async def list_transfers():
+    """List running, queued and recently finished transfer jobs, oldest first"""
+    summaries = []
+    for job in job_registry.list():
+        transfer_config = job.config.transfer_config
+        if job.kind == 'schema':
+            source = f"{transfer_config.source_db_schema}.*"
+            destination = f"{transfer_config.dest_db_schema}.{transfer_config.warehouse_prefix}*"
+        else:
+            source = f"{transfer_config.source_db_schema}.{transfer_config.table_name}"
+            destination = f"{transfer_config.dest_db_schema}.{transfer_config.warehouse_table}"
+        job_status = build_status_response(job)
+        summaries.append(JobSummary(
+            transfer_id=job.transfer_id,
+            kind=job.kind,
+            source=source,
+            destination=destination,
+            status=job_status.status,
+            is_running=job_status.is_running,
+            progress_percentage=job_status.progress_percentage,
+            created_at=job.created_at.isoformat(),
+            start_time=job_status.start_time
+        ))
+    return summaries
+
+async def status_event_stream(request: Request, resolve_job, follow: bool):
+    """
+    Server-Sent Events carrying StatusResponse snapshots. The job's status is
+    sampled every PROGRESS_EVENT_INTERVAL and sent only when it changed, so any
+    number of batches between samples collapse into one 'progress' event. A
+    single-job stream ends with an 'end' event once the job has finished;
+    follow=True keeps streaming whichever job is the latest.
+    """
+    last_payload = None
+    last_sent = time.monotonic()
+    
+    while not await request.is_disconnected():
+        job = resolve_job()
+        payload = build_status_response(job).model_dump_json()
+        
+        if payload != last_payload:
+            yield f"event: progress\ndata: {payload}\n\n"
+            last_payload, last_sent = payload, time.monotonic()
+        elif time.monotonic() - last_sent >= PROGRESS_HEARTBEAT_SECONDS:
+            # Comment line keeps proxies from closing an idle stream
+            yield ": heartbeat\n\n"
+            last_sent = time.monotonic()
+        
+        if not follow and job is not None and job.finished:
+            yield f"event: end\ndata: {payload}\n\n"
+            return
+        
+        await asyncio.sleep(PROGRESS_EVENT_INTERVAL)
+
+def event_stream_response(stream) -> StreamingResponse:
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/transfer/events")
+async def transfer_events(request: Request):
+    """Stream progress of the latest transfer, moving on to each newly started one"""
+    return event_stream_response(status_event_stream(request, job_registry.latest, follow=True))
+
+@app.get("/transfer/{transfer_id}/events")
+async def job_events(transfer_id: str, request: Request):
+    """Stream progress of one transfer until it finishes"""
+    job = get_job_or_404(transfer_id)
+    return event_stream_response(status_event_stream(request, lambda: job, follow=False))
+
+@app.get("/transfer/status", response_model=StatusResponse)
+async def get_transfer_status():
+    """Get the status of the most recently started transfer"""
+    return build_status_response(job_registry.latest())
+
+@app.get("/transfer/{transfer_id}/status", response_model=StatusResponse)
+async def get_job_status(transfer_id: str):
+    """Get the status of one transfer"""
+    return build_status_response(get_job_or_404(transfer_id))
+
 @app.post("/transfer/stop")
 async def stop_transfer():
-    """Stop the current transfer"""
-    global transfer_status
-    
-    if not transfer_status["is_running"]:
+    """Stop the most recently started transfer"""
+    job = job_registry.latest()
+    if job is None or job.finished:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No transfer is currently running"
         )
-    
-    # Note: This is a simple implementation. In production, you'd need
-    # proper thread management and graceful shutdown
-    transfer_status["status"] = "stopped"
-    transfer_status["is_running"] = False
-    transfer_status["logs"].append(f"{datetime.now().isoformat()}: Transfer stopped by user")
-    
-    return {"message": "Transfer stop requested"}
+    stop_job(job)
+    return {"message": "Transfer stop requested", "transfer_id": job.transfer_id}
+
+@app.post("/transfer/{transfer_id}/stop")
+async def stop_job_transfer(transfer_id: str):
+    """Stop one transfer"""
+    job = get_job_or_404(transfer_id)
+    stop_job(job)
+    return {"message": "Transfer stop requested", "transfer_id": job.transfer_id}
+
+def build_log_response(job: Optional[TransferJob], since: int) -> Dict[str, Any]:
+    """Log lines from sequence number since onwards; pass next_seq back as since to poll for new lines"""
+    if job is None:
+        return {"logs": [], "next_seq": 0, "truncated": False}
+    lines, next_seq, truncated = job.status["logs"].since(since)
+    return {"logs": lines, "next_seq": next_seq, "truncated": truncated}
 
 @app.get("/transfer/logs")
-async def get_transfer_logs():
-    """Get all transfer logs"""
-    global transfer_status
-    return {"logs": transfer_status["logs"]}
+async def get_transfer_logs(since: int = Query(0, ge=0, description="Only return lines with this sequence number or later")):
+    """Get the retained logs of the most recently started transfer"""
+    return build_log_response(job_registry.latest(), since)
+
+@app.get("/transfer/{transfer_id}/logs")
+async def get_job_logs(transfer_id: str, since: int = Query(0, ge=0, description="Only return lines with this sequence number or later")):
+    """Get the retained logs of one transfer"""
+    return build_log_response(get_job_or_404(transfer_id), since)
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+@app.get("/pool/stats")
+async def pool_stats():
+    """Get connection pool statistics for every database this process talks to"""
+    return {"pools": get_pool_stats()}
+
+# The catalog lookups below block on psycopg2 and the pool, so they are plain
+# defs that FastAPI runs in its threadpool, keeping the event loop (and every
+# SSE progress stream) free while a cache miss waits on the database
+
 @app.post("/database/schemas")
-async def get_schemas(source_db: SourceDatabaseConfig):
+def get_schemas(source_db: SourceDatabaseConfig):
     """Get all schemas from the source database"""
+    cache_key = (connection_fingerprint(source_db), "schemas", None, None)
+    cached = metadata_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     try:
-        # Set environment variables temporarily
-        os.environ['SOURCE_HOST'] = source_db.host
-        os.environ['SOURCE_PORT'] = str(source_db.port)
-        os.environ['SOURCE_DB'] = source_db.database
-        os.environ['SOURCE_USER'] = source_db.user
-        os.environ['SOURCE_PASSWORD'] = source_db.password
-        
-        transfer = PostgreSQLDataTransfer()
+        transfer = PostgreSQLDataTransfer(TransferSettings(source_settings(source_db)))
         schemas = transfer.get_schemas()
         
-        return {"schemas": [{"schema_name": schema} for schema in schemas]}
+        response = {"schemas": [{"schema_name": schema} for schema in schemas]}
+        metadata_cache.set(cache_key, response)
+        return response
         
     except Exception as e:
         logger.error(f"Error getting schemas: {e}")
@@ -343,20 +856,20 @@ async def get_schemas(source_db: SourceDatabaseConfig):
         )
 
 @app.post("/database/tables")
-async def get_tables_and_views(source_db: SourceDatabaseConfig, schema_name: str = Query(..., description="Schema name")):
+def get_tables_and_views(source_db: SourceDatabaseConfig, schema_name: str = Query(..., description="Schema name"), exact_counts: bool = Query(False, description="Run COUNT(*) per table instead of using catalog estimates")):
     """Get all tables and views from a specific schema"""
+    cache_key = (connection_fingerprint(source_db), "tables", schema_name, None, exact_counts)
+    cached = metadata_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     try:
-        # Set environment variables temporarily
-        os.environ['SOURCE_HOST'] = source_db.host
-        os.environ['SOURCE_PORT'] = str(source_db.port)
-        os.environ['SOURCE_DB'] = source_db.database
-        os.environ['SOURCE_USER'] = source_db.user
-        os.environ['SOURCE_PASSWORD'] = source_db.password
+        transfer = PostgreSQLDataTransfer(TransferSettings(source_settings(source_db)))
+        tables_and_views = transfer.get_tables_and_views(schema_name, exact_counts=exact_counts)
         
-        transfer = PostgreSQLDataTransfer()
-        tables_and_views = transfer.get_tables_and_views(schema_name)
-        
-        return {"tables": tables_and_views}
+        response = {"tables": tables_and_views}
+        metadata_cache.set(cache_key, response)
+        return response
         
     except Exception as e:
         logger.error(f"Error getting tables and views: {e}")
@@ -366,18 +879,17 @@ async def get_tables_and_views(source_db: SourceDatabaseConfig, schema_name: str
         )
 
 @app.post("/database/table-info")
-async def get_table_info(source_db: SourceDatabaseConfig, schema_name: str = Query(..., description="Schema name"), table_name: str = Query(..., description="Table name")):
+def get_table_info(source_db: SourceDatabaseConfig, schema_name: str = Query(..., description="Schema name"), table_name: str = Query(..., description="Table name")):
     """Get detailed information about a specific table"""
+    cache_key = (connection_fingerprint(source_db), "table-info", schema_name, table_name)
+    cached = metadata_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     try:
-        # Set environment variables temporarily
-        os.environ['SOURCE_HOST'] = source_db.host
-        os.environ['SOURCE_PORT'] = str(source_db.port)
-        os.environ['SOURCE_DB'] = source_db.database
-        os.environ['SOURCE_USER'] = source_db.user
-        os.environ['SOURCE_PASSWORD'] = source_db.password
-        
-        transfer = PostgreSQLDataTransfer()
+        transfer = PostgreSQLDataTransfer(TransferSettings(source_settings(source_db)))
         table_info = transfer.get_table_info(schema_name, table_name)
+        metadata_cache.set(cache_key, table_info)
         
         return table_info
         
@@ -388,6 +900,22 @@ async def get_table_info(source_db: SourceDatabaseConfig, schema_name: str = Que
             detail=f"Failed to get table info: {str(e)}"
         )
 
+@app.post("/database/cache/invalidate")
+async def invalidate_metadata_cache(
+    source_db: Optional[SourceDatabaseConfig] = None,
+    schema_name: Optional[str] = Query(None, description="Only invalidate this schema"),
+    table_name: Optional[str] = Query(None, description="Only invalidate this table")
+):
+    """Drop cached metadata for a database, schema or table (everything when no filter is given)"""
+    fingerprint = connection_fingerprint(source_db) if source_db else None
+    removed = metadata_cache.invalidate(fingerprint, schema_name, table_name)
+    return {"invalidated": removed, "cache": metadata_cache.stats()}
+
+@app.get("/database/cache/stats")
+async def metadata_cache_stats():
+    """Get metadata cache statistics"""
+    return metadata_cache.stats()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
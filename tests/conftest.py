@@ -0,0 +1,78 @@
+"""
+Fixtures for tests against a live PostgreSQL server.
+
+Set TEST_PG_HOST (and TEST_PG_PORT, TEST_PG_DB, TEST_PG_USER, TEST_PG_PASSWORD
+as needed) to run them; both sides of every transfer use that database, in
+throwaway schemas. Without TEST_PG_HOST the tests are skipped.
+"""
+
+import os
+import sys
+import uuid
+
+import psycopg2
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_transfer import PostgreSQLDataTransfer, TransferSettings
+
+
+def _connection_settings():
+    host = os.getenv('TEST_PG_HOST')
+    if not host:
+        pytest.skip("TEST_PG_HOST is not set")
+    connection = {
+        'host': host,
+        'port': os.getenv('TEST_PG_PORT', '5432'),
+        'database': os.getenv('TEST_PG_DB', 'postgres'),
+        'user': os.getenv('TEST_PG_USER', 'postgres'),
+        'password': os.getenv('TEST_PG_PASSWORD', ''),
+    }
+    settings = {'SSL_MODE': 'disable'}
+    for side in ('SOURCE', 'DEST'):
+        settings.update({
+            f'{side}_HOST': connection['host'],
+            f'{side}_PORT': connection['port'],
+            f'{side}_DB': connection['database'],
+            f'{side}_USER': connection['user'],
+            f'{side}_PASSWORD': connection['password'],
+        })
+    return connection, settings
+
+
+@pytest.fixture
+def database():
+    """Autocommit connection to the test database with a source and a warehouse schema, dropped afterwards"""
+    connection, settings = _connection_settings()
+    suffix = uuid.uuid4().hex[:8]
+    schemas = {'source': f"test_src_{suffix}", 'warehouse': f"test_wh_{suffix}"}
+
+    conn = psycopg2.connect(
+        host=connection['host'], port=connection['port'], dbname=connection['database'],
+        user=connection['user'], password=connection['password']
+    )
+    conn.autocommit = True
+    with conn.cursor() as cursor:
+        cursor.execute(f"CREATE SCHEMA {schemas['source']}")
+
+    def make_transfer(table_name: str, **overrides) -> PostgreSQLDataTransfer:
+        values = dict(settings, SOURCE_DB_SCHEMA=schemas['source'], DEST_DB_SCHEMA=schemas['warehouse'],
+                      TABLE_NAME=table_name, WAREHOUSE_TABLE=table_name)
+        values.update(overrides)
+        return PostgreSQLDataTransfer(TransferSettings(values))
+
+    try:
+        yield conn, schemas, make_transfer
+    finally:
+        with conn.cursor() as cursor:
+            for schema in schemas.values():
+                cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        conn.close()
+
+
+def query(conn, sql, params=None):
+    """Run sql and return its rows, or None for statements without a result"""
+    with conn.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall() if cursor.description else None
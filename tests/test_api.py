@@ -0,0 +1,59 @@
+"""Transfer API job admission"""
+
+import asyncio
+import threading
+
+from fastapi.testclient import TestClient
+
+from conftest import query
+import main
+
+
+def test_schema_transfer_refuses_tables_another_job_is_loading(database):
+    conn, schemas, make_transfer = database
+    query(conn, f"""
+        CREATE TABLE {schemas['source']}.items (id int PRIMARY KEY);
+        CREATE TABLE {schemas['source']}.other (id int PRIMARY KEY);
+    """)
+    settings = make_transfer('items').settings.values
+    db = {'host': settings['DEST_HOST'], 'port': int(settings['DEST_PORT']), 'database': settings['DEST_DB'],
+          'user': settings['DEST_USER'], 'password': settings['DEST_PASSWORD']}
+    transfer_config = {'source_db_schema': schemas['source'], 'dest_db_schema': schemas['warehouse'], 'ssl_mode': 'disable'}
+
+    # A single-table job holding items until released
+    release = threading.Event()
+    table_request = main.DataTransferRequest(
+        source_db=db, dest_db=db,
+        transfer_config=dict(transfer_config, table_name='items', warehouse_table='items')
+    )
+    busy = main.job_registry.submit('table', table_request, lambda job: release.wait(10),
+                                    frozenset([(db['host'], db['database'], schemas['warehouse'], 'items')]))
+    try:
+        client = TestClient(main.app)
+        schema_request = {'source_db': db, 'dest_db': db, 'transfer_config': transfer_config}
+        response = client.post('/transfer/schema/start', json=schema_request)
+        assert response.status_code == 409
+        assert busy.transfer_id in response.json()['detail']
+
+        response = client.post('/transfer/schema/start', json=dict(schema_request, transfer_config=dict(transfer_config, tables=['nope'])))
+        assert response.status_code == 400
+    finally:
+        release.set()
+        busy.thread.join()
+
+
+def test_metadata_lookups_do_not_block_the_event_loop(database):
+    conn, schemas, make_transfer = database
+    query(conn, f"CREATE TABLE {schemas['source']}.items (id int PRIMARY KEY)")
+    settings = make_transfer('items').settings.values
+    db = {'host': settings['SOURCE_HOST'], 'port': int(settings['SOURCE_PORT']), 'database': settings['SOURCE_DB'],
+          'user': settings['SOURCE_USER'], 'password': settings['SOURCE_PASSWORD']}
+
+    # Async handlers would hold the event loop for the whole catalog read
+    for handler in (main.get_schemas, main.get_tables_and_views, main.get_table_info):
+        assert not asyncio.iscoroutinefunction(handler)
+
+    client = TestClient(main.app)
+    response = client.post('/database/tables', params={'schema_name': schemas['source']}, json=db)
+    assert response.status_code == 200
+    assert [t['table_name'] for t in response.json()['tables']] == ['items']
@@ -0,0 +1,27 @@
+"""Cancelling a job while it is inside a database statement"""
+
+import threading
+
+import pytest
+
+from conftest import query
+from data_transfer import TransferCancelled
+
+
+@pytest.mark.parametrize('method', ['count', 'checksum'])
+def test_cancel_during_verification_raises_transfer_cancelled(database, method):
+    conn, schemas, make_transfer = database
+    query(conn, f"""
+        CREATE TABLE {schemas['source']}.items (id int PRIMARY KEY);
+        INSERT INTO {schemas['source']}.items SELECT generate_series(1, 10);
+        CREATE SCHEMA {schemas['warehouse']};
+        CREATE VIEW {schemas['warehouse']}.items AS SELECT id FROM {schemas['source']}.items, pg_sleep(30);
+    """)
+    transfer = make_transfer('items', VERIFY_METHOD=method)
+    timer = threading.Timer(0.5, transfer.cancel_token.cancel)
+    timer.start()
+    try:
+        with pytest.raises(TransferCancelled):
+            transfer.verify_transfer()
+    finally:
+        timer.cancel()
@@ -0,0 +1,53 @@
+"""Full reloads: shadow table swaps and deferred index builds"""
+
+import pytest
+
+from conftest import query
+
+
+@pytest.mark.parametrize('column', [
+    "seq int GENERATED ALWAYS AS IDENTITY",
+    "doubled int GENERATED ALWAYS AS (id * 2) STORED",
+])
+def test_swap_falls_back_in_place_for_identity_and_generated_columns(database, column):
+    conn, schemas, make_transfer = database
+    source, warehouse = f"{schemas['source']}.items", f"{schemas['warehouse']}.items"
+    query(conn, f"""
+        CREATE TABLE {source} (id int PRIMARY KEY, note text);
+        INSERT INTO {source} SELECT g, 'note ' || g FROM generate_series(1, 20) g;
+        CREATE SCHEMA {schemas['warehouse']};
+        CREATE TABLE {warehouse} (id int PRIMARY KEY, note text, {column});
+    """)
+    transfer = make_transfer('items', FULL_LOAD_STRATEGY='swap')
+    oid = query(conn, "SELECT %s::regclass::oid", (warehouse,))
+
+    with conn.cursor() as cursor:
+        assert any('identity or generated' in reason for reason in transfer._swap_blockers(cursor, warehouse))
+    assert transfer.full_transfer()
+
+    assert query(conn, "SELECT %s::regclass::oid", (warehouse,)) == oid
+    assert query(conn, f"SELECT count(*) FROM {warehouse}") == [(20,)]
+    assert query(conn, "SELECT to_regclass(%s)", (f"{warehouse}_shadow",)) == [(None,)]
+
+
+def test_failed_swap_drops_the_shadow_table(database):
+    conn, schemas, make_transfer = database
+    source, warehouse = f"{schemas['source']}.items", f"{schemas['warehouse']}.items"
+    query(conn, f"""
+        CREATE TABLE {source} (id int, note text);
+        INSERT INTO {source} SELECT g % 10, 'note ' || g FROM generate_series(1, 20) g;
+        CREATE SCHEMA {schemas['warehouse']};
+        CREATE TABLE {warehouse} (id int, note text);
+        CREATE INDEX items_note ON {warehouse} (note);
+        CREATE UNIQUE INDEX items_id ON {warehouse} (id);
+        INSERT INTO {warehouse} SELECT generate_series(1, 5), 'old';
+    """)
+    # The source has duplicate ids, so the unique index cannot be built on the shadow
+    transfer = make_transfer('items', FULL_LOAD_STRATEGY='swap', RESUME='true')
+    with pytest.raises(Exception):
+        transfer.full_transfer()
+
+    assert query(conn, "SELECT to_regclass(%s)", (f"{warehouse}_shadow",)) == [(None,)]
+    assert query(conn, f"SELECT count(*) FROM {warehouse}") == [(5,)]
+    assert sorted(query(conn, f"SELECT indexrelid::regclass::text FROM pg_index WHERE indrelid = '{warehouse}'::regclass")) == \
+        [(f"{schemas['warehouse']}.items_id",), (f"{schemas['warehouse']}.items_note",)]
@@ -0,0 +1,31 @@
+"""Choosing how the source table is paged"""
+
+import pytest
+
+from conftest import query
+
+
+class OldServerCursor:
+    """Cursor that reports a pre-14 server, where ctid ranges have no TID range scan"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.connection = type('Connection', (), {'server_version': 130000})()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+@pytest.mark.parametrize('mode', ['auto', 'ctid'])
+def test_ctid_paging_needs_postgresql_14(database, mode):
+    conn, schemas, make_transfer = database
+    query(conn, f"""
+        CREATE TABLE {schemas['source']}.keyed (id int PRIMARY KEY);
+        CREATE TABLE {schemas['source']}.heap (note text);
+    """)
+
+    with conn.cursor() as cursor:
+        assert make_transfer('heap', PAGINATION_MODE=mode)._resolve_pagination(cursor) == ('ctid', None)
+        old_server = OldServerCursor(cursor)
+        assert make_transfer('keyed', PAGINATION_MODE=mode)._resolve_pagination(old_server) == ('keyset', ['id'])
+        assert make_transfer('heap', PAGINATION_MODE=mode)._resolve_pagination(old_server) == ('offset', None)
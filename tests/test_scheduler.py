@@ -0,0 +1,26 @@
+"""Multi-table scheduling"""
+
+from conftest import query
+from transfer_scheduler import MultiTableTransfer
+
+
+def test_whole_schema_copies_partitioned_tables_once(database):
+    conn, schemas, make_transfer = database
+    source = schemas['source']
+    query(conn, f"""
+        CREATE TABLE {source}.events (id int, day date, PRIMARY KEY (id, day)) PARTITION BY RANGE (day);
+        CREATE TABLE {source}.events_2025 PARTITION OF {source}.events FOR VALUES FROM ('2025-01-01') TO ('2026-01-01');
+        CREATE TABLE {source}.events_2026 PARTITION OF {source}.events FOR VALUES FROM ('2026-01-01') TO ('2027-01-01');
+        INSERT INTO {source}.events SELECT g, date '2025-07-01' + g FROM generate_series(1, 300) g;
+        CREATE TABLE {source}.plain (id int PRIMARY KEY);
+        INSERT INTO {source}.plain SELECT generate_series(1, 10);
+    """)
+
+    scheduler = MultiTableTransfer(schema_name=source, max_workers=3, settings=make_transfer('events').settings)
+    assert [t['table_name'] for t in scheduler.plan()] == ['events', 'plain']
+    assert scheduler.run()
+
+    warehouse = schemas['warehouse']
+    assert query(conn, f"SELECT count(*) FROM {warehouse}.events") == [(300,)]
+    assert query(conn, f"SELECT count(*) FROM ONLY {warehouse}.events_2026") == [(117,)]
+    assert query(conn, f"SELECT count(*) FROM {warehouse}.plain") == [(10,)]
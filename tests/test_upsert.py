@@ -0,0 +1,41 @@
+"""Incremental upserts into warehouse tables"""
+
+import pytest
+
+from conftest import query
+
+
+def test_conflict_key_ignores_include_columns(database):
+    conn, schemas, make_transfer = database
+    source = f"{schemas['source']}.items"
+    query(conn, f"""
+        CREATE TABLE {source} (id int, tag text, note text, PRIMARY KEY (id) INCLUDE (tag));
+        INSERT INTO {source} SELECT g, 'tag ' || g, 'note ' || g FROM generate_series(1, 50) g;
+    """)
+    transfer = make_transfer('items')
+    transfer.create_warehouse_table_if_not_exists(None)
+    assert transfer.full_transfer()
+
+    with conn.cursor() as cursor:
+        assert transfer._get_conflict_key(cursor, f"{schemas['warehouse']}.items") == ['id']
+
+    query(conn, f"UPDATE {source} SET tag = 'retagged', note = 'changed' WHERE id <= 5")
+    assert transfer.transfer_batch_copy('id <= 10', mode='incremental')
+    assert query(conn, f"SELECT tag, note FROM {schemas['warehouse']}.items WHERE id = 3") == [('retagged', 'changed')]
+    assert query(conn, f"SELECT count(*) FROM {schemas['warehouse']}.items") == [(50,)]
+
+
+def test_conflict_key_skips_deferrable_indexes(database):
+    conn, schemas, make_transfer = database
+    warehouse = f"{schemas['warehouse']}.items"
+    query(conn, f"""
+        CREATE SCHEMA {schemas['warehouse']};
+        CREATE TABLE {warehouse} (id int, code text UNIQUE DEFERRABLE);
+    """)
+    transfer = make_transfer('items')
+
+    with conn.cursor() as cursor:
+        with pytest.raises(ValueError):
+            transfer._get_conflict_key(cursor, warehouse)
+        cursor.execute(f"CREATE UNIQUE INDEX ON {warehouse} (id)")
+        assert transfer._get_conflict_key(cursor, warehouse) == ['id']
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Multi-Table Transfer Scheduler
+Transfers a list of tables, or every table of a schema, across a bounded pool
+of table workers. Each table runs through its own copy of a PostgreSQLDataTransfer
+built from the given TransferSettings (or the environment), writing to a
+warehouse table of the same name (optionally prefixed) in DEST_DB_SCHEMA.
+"""
+
+import os
+import sys
+import copy
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from dotenv import load_dotenv
+
+from data_transfer import PostgreSQLDataTransfer, TransferSettings, CancellationToken, TransferCancelled, get_connection_pool
+
+logger = logging.getLogger(__name__)
+
+class MultiTableTransfer:
+    """
+    Runs one transfer per table on up to max_workers threads.
+
+    Tables are scheduled largest first by catalog row estimate: with a bounded
+    pool, starting the long transfers early keeps a big table from being the
+    last one started and so shortens the total run. A failed table is recorded
+    and does not stop the others.
+    """
+
+    def __init__(self, schema_name: Optional[str] = None, tables: Optional[List[str]] = None,
+                 max_workers: int = 4, mode: str = 'full', date_filter: Optional[str] = None,
+                 warehouse_prefix: str = '', verify: bool = False, settings: Optional[TransferSettings] = None,
+                 cancel_token: Optional[CancellationToken] = None, progress_callback=None):
+        # Table transfers are copies of the template, so they all share its cancel token
+        self.template = PostgreSQLDataTransfer(settings, cancel_token)
+        self.schema_name = schema_name or self.template.source_db_schema
+        self.tables = tables
+        self.max_workers = max(1, max_workers)
+        self.mode = mode
+        self.date_filter = date_filter
+        self.warehouse_prefix = warehouse_prefix
+        self.verify = verify
+        self.progress_callback = progress_callback
+        self.table_status: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def plan(self) -> List[Dict[str, Any]]:
+        """
+        Resolve the tables to transfer with their row estimates, largest first.
+        A whole schema means its tables only; views must be listed explicitly.
+        Partitions are left out of a whole schema: their partitioned parent
+        already copies their rows, into warehouse partitions of the same names.
+        """
+        catalog = {t['table_name']: t for t in self.template.get_tables_and_views(self.schema_name)}
+
+        if self.tables:
+            missing = [name for name in self.tables if name not in catalog]
+            if missing:
+                raise ValueError(f"Tables not found in schema '{self.schema_name}': {', '.join(missing)}")
+            selected = [catalog[name] for name in self.tables]
+        else:
+            selected = [t for t in catalog.values() if t['table_type'] == 'table' and not t['is_partition']]
+
+        return sorted(selected, key=lambda t: t['row_count'] or 0, reverse=True)
+
+    def run(self) -> bool:
+        """
+        Transfer every planned table; returns True only if all of them succeeded.
+        Raises TransferCancelled after the workers wind down if the run was cancelled.
+        """
+        start_time = time.time()
+        tables = self.plan()
+
+        with self._lock:
+            self.table_status = {
+                t['table_name']: {
+                    'table_name': t['table_name'],
+                    'warehouse_table': f"{self.warehouse_prefix}{t['table_name']}",
+                    'rows_estimated': t['row_count'] or 0,
+                    'status': 'pending',
+                    'transferred_rows': 0,
+                    'current_batch': 0,
+                    'start_time': None,
+                    'end_time': None,
+                    'error_message': None,
+                }
+                for t in tables
+            }
+
+        if not tables:
+            logger.info(f"No tables to transfer in schema '{self.schema_name}'")
+            return True
+
+        self._reserve_connections(min(self.max_workers, len(tables)))
+        logger.info(
+            f"Transferring {len(tables)} tables from '{self.schema_name}' with {min(self.max_workers, len(tables))} workers "
+            f"(~{sum(t['row_count'] or 0 for t in tables):,} rows)"
+        )
+
+        # The pool takes work in submission order, so submitting largest first schedules largest first
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='transfer-table') as pool:
+            for t in tables:
+                pool.submit(self._run_table, t['table_name'])
+
+        statuses = self.status()
+        failed = [s['table_name'] for s in statuses if s['status'] != 'completed']
+        total_rows = sum(s['transferred_rows'] for s in statuses)
+        logger.info(
+            f"Multi-table transfer finished in {time.time() - start_time:.2f}s: "
+            f"{len(statuses) - len(failed)}/{len(statuses)} tables, {total_rows:,} rows"
+        )
+        if failed:
+            logger.error(f"Tables that did not complete: {', '.join(failed)}")
+        self.template.cancel_token.raise_if_cancelled()
+        return not failed
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Per-table status snapshot, in scheduling order"""
+        with self._lock:
+            return [dict(s) for s in self.table_status.values()]
+
+    def _reserve_connections(self, workers: int):
+        """Size the shared pools so every table worker can hold its full set of connections"""
+        per_table = max(1, self.template.parallelism)
+        source_pool = get_connection_pool(self.template.source_config)
+        dest_pool = get_connection_pool(self.template.dest_config)
+        if source_pool is dest_pool:
+            source_pool.ensure_max_size(2 * per_table * workers)
+        else:
+            source_pool.ensure_max_size(per_table * workers)
+            dest_pool.ensure_max_size(per_table * workers)
+
+    def _update(self, table_name: str, **changes):
+        """Apply changes to one table's status and pass a snapshot of all tables to progress_callback"""
+        with self._lock:
+            self.table_status[table_name].update(changes)
+        if self.progress_callback:
+            self.progress_callback(self.status())
+
+    def _run_table(self, table_name: str):
+        """Transfer one table, recording its outcome instead of raising"""
+        warehouse_table = f"{self.warehouse_prefix}{table_name}"
+        if self.template.cancel_token.cancelled:
+            self._update(table_name, status='cancelled')
+            return
+        self._update(table_name, status='running', start_time=datetime.now().isoformat())
+        logger.info(f"[{table_name}] Starting {self.mode} transfer into {warehouse_table}")
+
+        def on_progress(transferred_rows: int, batch_number: int):
+            self._update(table_name, transferred_rows=transferred_rows, current_batch=batch_number)
+
+        try:
+            transfer = copy.copy(self.template)
+            transfer.source_db_schema = self.schema_name
+            transfer.table_name = table_name
+            transfer.warehouse_table = warehouse_table
+            transfer.create_warehouse_table_if_not_exists(None)
+
+            if self.mode == 'daily':
+                success = transfer.daily_incremental_transfer(progress_callback=on_progress)
+            elif self.mode == 'full':
+                success = transfer.full_transfer(progress_callback=on_progress)
+            elif self.mode == 'repair':
+                success = transfer.repair_transfer(self.date_filter, progress_callback=on_progress)
+            else:
+                success = transfer.transfer_batch_copy(self.date_filter, mode='incremental', progress_callback=on_progress)
+
+            if not success:
+                table_status, error_message = 'failed', 'Data transfer failed'
+            elif self.verify and not transfer.verify_transfer(self.date_filter if self.mode in ('custom', 'repair') else None):
+                table_status = 'verification_failed'
+                error_message = transfer.last_verification['summary'] if transfer.last_verification else 'Row counts differ after transfer'
+            else:
+                table_status, error_message = 'completed', None
+
+            self._update(table_name, status=table_status, error_message=error_message, end_time=datetime.now().isoformat())
+        except TransferCancelled:
+            logger.warning(f"[{table_name}] Transfer cancelled")
+            self._update(table_name, status='cancelled', end_time=datetime.now().isoformat())
+        except Exception as e:
+            logger.error(f"[{table_name}] Transfer error: {e}")
+            self._update(table_name, status='error', error_message=str(e), end_time=datetime.now().isoformat())
+
+def main():
+    """Transfer TRANSFER_TABLES (comma separated), or every table of SOURCE_DB_SCHEMA"""
+    # Only the CLI reads .env; importing the scheduler (as the API does) must not touch os.environ
+    load_dotenv()
+    tables = [name.strip() for name in os.getenv('TRANSFER_TABLES', '').split(',') if name.strip()]
+    scheduler = MultiTableTransfer(
+        tables=tables or None,
+        max_workers=int(os.getenv('TABLE_WORKERS', '4')),
+        mode=os.getenv('TRANSFER_MODE', 'full'),
+        date_filter=os.getenv('DATE_FILTER') or None,
+        warehouse_prefix=os.getenv('WAREHOUSE_TABLE_PREFIX', ''),
+        verify=os.getenv('VERIFY_TRANSFER', 'false').lower() == 'true'
+    )
+
+    if not scheduler.run():
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()